@@ -0,0 +1,170 @@
+import argparse
+import copy
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import exercise2
+
+
+class PolicyServer:
+    # Serves one exercise2 Policy to many threads. Decisions come from a
+    # thread-local copy of the latest published snapshot, so select_arm
+    # never takes a lock. Feedback is appended to a per-thread deque and a
+    # merger thread drains all of them every merge_interval seconds into
+    # the live policy with update_many, then publishes a new snapshot.
+    def __init__(self, policy: exercise2.Policy, merge_interval: float = 0.01):
+        self.policy = policy
+        self.merge_interval = merge_interval
+        self.snapshot = (0, copy.deepcopy(policy))
+        self.local = threading.local()
+        self.buffers = []
+        self.buffers_lock = threading.Lock()
+        self.merge_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.merger = None
+        self.merges = 0
+
+    def local_policy(self):
+        version, policy = self.snapshot
+        if getattr(self.local, "version", None) != version:
+            self.local.version = version
+            self.local.policy = copy.deepcopy(policy)
+        return self.local.policy
+
+    def local_buffer(self):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            buffer = self.local.buffer = deque()
+            with self.buffers_lock:
+                self.buffers.append(buffer)
+        return buffer
+
+    def select_arm(self, context: list[float] = None) -> int:
+        policy = self.local_policy()
+        if context is not None:
+            policy.observe(context)
+        return policy.select_arm()
+
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        return self.local_policy().select_arms(B, contexts)
+
+    def update(self, arm: int, reward: float, context: list[float] = None) -> None:
+        # deque.append is atomic; the merger pops from the other end
+        self.local_buffer().append((arm, reward, context))
+
+    def merge(self) -> int:
+        # drains every buffer into the live policy; returns the feedback count
+        with self.merge_lock:
+            with self.buffers_lock:
+                buffers = list(self.buffers)
+            feedback = []
+            for buffer in buffers:
+                for _ in range(len(buffer)):
+                    feedback.append(buffer.popleft())
+            if not feedback:
+                return 0
+            arms, rewards, contexts = zip(*feedback)
+            if any(context is None for context in contexts):
+                contexts = None
+            self.policy.update_many(arms, rewards, contexts)
+            self.snapshot = (self.snapshot[0] + 1, copy.deepcopy(self.policy))
+            self.merges += 1
+            return len(feedback)
+
+    def run_merger(self):
+        while not self.stopped.wait(self.merge_interval):
+            self.merge()
+
+    def start(self):
+        self.stopped.clear()
+        self.merger = threading.Thread(target=self.run_merger, daemon=True)
+        self.merger.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.merger is not None:
+            self.merger.join()
+            self.merger = None
+        self.merge()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def load_test(
+    server: PolicyServer,
+    arms: list[exercise2.Arm],
+    num_requests: int,
+    num_threads: int,
+    contexts=None,
+):
+    # num_threads clients, each selecting an arm and reporting its reward;
+    # select_arm latency is measured per request
+    latencies = np.zeros(num_requests, dtype=np.int64)
+    rewards = np.zeros(num_requests, dtype=np.int64)
+
+    def client(indices):
+        for i in indices:
+            context = contexts() if contexts is not None else None
+            begin = time.perf_counter_ns()
+            arm = server.select_arm(context)
+            latencies[i] = time.perf_counter_ns() - begin
+            rewards[i] = arms[arm].pull(context)
+            server.update(arm, rewards[i], context)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(num_threads) as executor:
+        list(executor.map(client, np.array_split(np.arange(num_requests), num_threads)))
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) / 1000
+    return {
+        "requests": num_requests,
+        "threads": num_threads,
+        "qps": num_requests / elapsed,
+        "p50_us": float(p50),
+        "p99_us": float(p99),
+        "mean_reward": float(rewards.mean()),
+        "merges": server.merges,
+    }
+
+
+POLICIES = {
+    "Greedy": lambda arms: exercise2.Greedy(arms),
+    "EpsilonGreedy": lambda arms: exercise2.EpsilonGreedy(arms, 0.1),
+    "UCB": lambda arms: exercise2.UCB(arms),
+    "ThompsonSampling": lambda arms: exercise2.ThompsonSampling(arms),
+    "DiscountedThompsonSampling": lambda arms: exercise2.DiscountedThompsonSampling(
+        arms
+    ),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the bandit policy server")
+    parser.add_argument("--policy", choices=POLICIES, default="ThompsonSampling")
+    parser.add_argument("--arms", type=float, nargs="+", default=[0.2, 0.5, 0.7])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--merge-interval", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    arms = [exercise2.Arm(p) for p in args.arms]
+    with PolicyServer(POLICIES[args.policy](arms), args.merge_interval) as server:
+        report = load_test(server, arms, args.requests, args.threads)
+    print(
+        f"{args.policy}: {report['qps']:.0f} req/s, "
+        f"select_arm p50 {report['p50_us']:.1f}us p99 {report['p99_us']:.1f}us, "
+        f"mean reward {report['mean_reward']:.3f}, {report['merges']} merges"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from .actor_critic import PlayerActorCritic
+from .constants import DRAW, HIT, LOSE, STATE_SHAPE, STAY, WIN
+from .engine import BlackJack, Dealer, Deck, print_colored, set_verbose
+from .player import Player
+from .players import (
+    PlayerBase,
+    PlayerDQ,
+    PlayerLambda,
+    PlayerMC,
+    PlayerQ,
+    PlayerQLambda,
+    PlayerSARSA,
+    PlayerSARSALambda,
+    PlayerUser,
+)
+from .table import QTable, state_index
+from .train import train
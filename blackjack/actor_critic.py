@@ -0,0 +1,152 @@
+import math
+import random
+
+import numpy as np
+
+from .constants import HIT, STATE_SHAPE, STAY
+from .player import Player
+
+
+class PlayerActorCritic(Player):
+    # the (ace count, sum of non-ace cards, dealer card) state indexes the tables directly
+    def __init__(
+        self,
+        file_name: str = None,
+        actor_lr: float = 0.01,
+        critic_lr: float = 0.05,
+        gamma: float = 1.0,
+        n_step: int = 1,
+    ):
+        super().__init__()
+        self.actor = np.zeros(STATE_SHAPE + (2,))  # softmax preferences
+        self.critic = np.zeros(STATE_SHAPE)  # state values
+        self.visit_count = np.zeros(STATE_SHAPE, dtype=np.int64)
+        self.actor_lr = actor_lr
+        self.critic_lr = critic_lr
+        self.gamma = gamma
+        self.n_step = n_step
+        self.version = 0  # bumped on every change to the actor
+        if file_name:
+            self.load_entry(file_name)
+        self.trajectory = []  # (state, action) of the current hand
+        self.updated = 0  # number of trajectory steps already updated
+
+    def load_entry(self, file_name: str):
+        import pandas as pd
+
+        df = pd.read_csv(file_name)
+        # entries saved before the actor-critic rewrite hold Q values, not
+        # action probabilities, and have no state value column
+        if "V" not in df.columns:
+            raise ValueError(f"{file_name} is not an actor-critic entry (no V column)")
+        for _, row in df.iterrows():
+            state = (int(row["Ace"]), int(row["Value"]), int(row["Dealer"]))
+            self.actor[state + (HIT,)] = math.log(max(row["Hit"], 1e-12))
+            self.actor[state + (STAY,)] = math.log(max(row["Stay"], 1e-12))
+            self.critic[state] = row["V"]
+            # save_entry writes visited states only; keep the loaded ones
+            self.visit_count[state] = max(self.visit_count[state], 1)
+        self.version += 1
+
+    def entry_version(self):
+        return self.version
+
+    def q_values(self, state):
+        # the actor's preferences stand in for Q values: greedy over them is
+        # the most probable action, which is what the frozen policy plays
+        preference = self.actor[state]
+        return preference[HIT], preference[STAY]
+
+    def hit_probability(self, state):
+        preference = self.actor[state]
+        return 1 / (1 + math.exp(preference[STAY] - preference[HIT]))
+
+    def action_probabilities(self, state):
+        if self.frozen:
+            return super().action_probabilities(state)
+        p_hit = self.hit_probability(state)
+        return p_hit, 1 - p_hit
+
+    def policy(self):
+        if self.frozen:
+            return self.frozen_policy()
+        state = self.get_state()
+        self.visit_count[state] += 1
+        next_action = HIT if random.random() < self.hit_probability(state) else STAY
+        self.trajectory.append((state, next_action))
+
+        t = len(self.trajectory) - 1 - self.n_step
+        if t >= 0:  # n-step TD update with bootstrap from the current state
+            self.update(t, self.gamma**self.n_step * self.critic[state])
+        return next_action
+
+    def receive_result(self, result):
+        if self.frozen:
+            return
+        last = len(self.trajectory) - 1
+        for t in range(self.updated, len(self.trajectory)):
+            self.update(t, self.gamma ** (last - t) * result)
+        self.trajectory = []
+        self.updated = 0
+
+    def update(self, t, target):
+        state, action = self.trajectory[t]
+        delta = target - self.critic[state]
+        self.critic[state] += self.critic_lr * delta
+        # grad of log softmax: 1[a = b] - pi(b), and pi(stay) = 1 - pi(hit)
+        grad_hit = (action == HIT) - self.hit_probability(state)
+        self.actor[state + (HIT,)] += self.actor_lr * delta * grad_hit
+        self.actor[state + (STAY,)] -= self.actor_lr * delta * grad_hit
+        self.updated = t + 1
+        self.version += 1
+
+    def update_episodes(self, states, actions, lengths, results):
+        # Batched update from whole episodes, e.g. from a vectorized environment.
+        # states: (N, T, 3), actions: (N, T), lengths: (N,), results: (N,)
+        # steps past an episode's length are padding and ignored.
+        states = np.asarray(states, dtype=np.int64)
+        actions = np.asarray(actions)
+        lengths = np.asarray(lengths)
+        results = np.asarray(results, dtype=np.float64)
+        t = np.arange(states.shape[1])
+        valid = t < lengths[:, None]
+        index = (states[..., 0], states[..., 1], states[..., 2])
+
+        value = self.critic[index]
+        boot = np.minimum(t + self.n_step, states.shape[1] - 1)
+        terminal = t + self.n_step >= lengths[:, None]
+        target = np.where(
+            terminal,
+            self.gamma ** (lengths[:, None] - 1 - t) * results[:, None],
+            self.gamma**self.n_step * value[:, boot],
+        )
+        delta = np.where(valid, target - value, 0.0)
+
+        preference = self.actor[index]
+        hit_probability = 1 / (1 + np.exp(preference[..., STAY] - preference[..., HIT]))
+        step = self.actor_lr * delta * ((actions == HIT) - hit_probability)
+
+        np.add.at(self.critic, index, self.critic_lr * delta)
+        np.add.at(self.actor, index + (HIT,), step)
+        np.add.at(self.actor, index + (STAY,), -step)
+        np.add.at(self.visit_count, index, valid)
+        self.version += 1
+
+    def save_entry(self, file_name: str):
+        import pandas as pd
+
+        data = []
+        for state in zip(*np.nonzero(self.visit_count)):
+            p_hit = self.hit_probability(state)
+            data.append(
+                [
+                    state[0],
+                    state[1],
+                    state[2],
+                    round(p_hit, 3),
+                    round(1 - p_hit, 3),
+                    round(self.critic[state], 3),
+                ]
+            )
+        df = pd.DataFrame(data, columns=["Ace", "Value", "Dealer", "Hit", "Stay", "V"])
+        df.to_csv(f"files/{file_name}.csv", index=False)
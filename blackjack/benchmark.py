@@ -0,0 +1,190 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .actor_critic import PlayerActorCritic
+from .engine import BlackJack, Dealer
+from .players import PlayerBase, PlayerDQ, PlayerMC, PlayerQ, PlayerSARSA
+
+PLAYERS = [PlayerBase, PlayerMC, PlayerSARSA, PlayerQ, PlayerDQ, PlayerActorCritic]
+# libraries the CLI must not import just to start
+HEAVY_MODULES = ["pandas", "plotly", "matplotlib", "colored"]
+
+
+def play_hands(player, num_hands: int):
+    dealer = Dealer()
+    for _ in range(num_hands):
+        dealer.reset()
+        player.reset()
+        game = BlackJack(dealer, player)
+        player.receive_result(game.play())
+
+
+def seeded_player(player_class, seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+    return player_class()
+
+
+def timed(function):
+    # wraps a zero-argument callable; stats = [calls, total ns inside the call]
+    stats = [0, 0]
+
+    def wrapper():
+        begin = time.perf_counter_ns()
+        result = function()
+        stats[1] += time.perf_counter_ns() - begin
+        stats[0] += 1
+        return result
+
+    return wrapper, stats
+
+
+def timer_overhead_ns(repeat: int = 100000):
+    # time measured around an empty call, subtracted from the policy timings
+    noop, stats = timed(lambda: None)
+    for _ in range(repeat):
+        noop()
+    return stats[1] / stats[0]
+
+
+def benchmark_player(player_class, num_hands: int, seed: int, overhead_ns: float):
+    # three passes over the same seeded hands: throughput, policy timing, memory
+    player = seeded_player(player_class, seed)
+    start = time.perf_counter()
+    play_hands(player, num_hands)
+    elapsed = time.perf_counter() - start
+
+    player = seeded_player(player_class, seed)
+    player.policy, policy_stats = timed(player.policy)
+    play_hands(player, num_hands)
+    calls, policy_ns = policy_stats
+
+    tracemalloc.start()
+    player = seeded_player(player_class, seed)
+    play_hands(player, num_hands)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "player": player_class.__name__,
+        "hands": num_hands,
+        "seconds": elapsed,
+        "hands_per_second": num_hands / elapsed,
+        "policy_calls": calls,
+        "ns_per_policy": max(policy_ns / max(calls, 1) - overhead_ns, 0.0),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(num_hands: int, seed: int, player_classes=PLAYERS):
+    overhead_ns = timer_overhead_ns()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "hands": num_hands,
+        "seed": seed,
+        "timer_overhead_ns": overhead_ns,
+        "results": [
+            benchmark_player(player_class, num_hands, seed, overhead_ns)
+            for player_class in player_classes
+        ],
+    }
+
+
+def startup(module: str = "blackjack.cli", runs: int = 5):
+    # wall time of a fresh interpreter importing module, and the heavy
+    # libraries that came with it
+    script = (
+        "import json, sys; import " + module + "; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        ).stdout
+        times.append(time.perf_counter() - start)
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": statistics.median(times) * 1000,
+        "heavy_modules": json.loads(output),
+    }
+
+
+def compare(report, baseline, tolerance: float):
+    # returns the players whose hands/s dropped by more than tolerance
+    previous = {result["player"]: result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        if result["player"] not in previous:
+            continue
+        before = previous[result["player"]]["hands_per_second"]
+        if result["hands_per_second"] < before * (1 - tolerance):
+            regressions.append((result["player"], before, result["hands_per_second"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hands/s benchmark for every player")
+    parser.add_argument("--hands", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--players", nargs="*", help="player class names")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="time importing the CLI instead; fails if it loads a heavy library",
+    )
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        report = startup()
+        print(f"{report['module']}: {report['median_ms']:.0f}ms")
+        if report["heavy_modules"]:
+            print(f"REGRESSION startup imports {', '.join(report['heavy_modules'])}")
+            return 1
+        return 0
+
+    player_classes = PLAYERS
+    if args.players:
+        player_classes = [p for p in PLAYERS if p.__name__ in args.players]
+    report = run(args.hands, args.seed, player_classes)
+
+    print(f"{'player':<20}{'hands/s':>12}{'ns/policy':>12}{'peak KiB':>12}")
+    for result in report["results"]:
+        print(
+            f"{result['player']:<20}"
+            f"{result['hands_per_second']:>12.0f}"
+            f"{result['ns_per_policy']:>12.0f}"
+            f"{result['peak_memory_bytes'] / 1024:>12.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for player, before, after in regressions:
+            print(f"REGRESSION {player}: {before:.0f} -> {after:.0f} hands/s")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import argparse
+import inspect
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from . import players
+from .actor_critic import PlayerActorCritic
+from .constants import DRAW, LOSE, WIN
+from .engine import BlackJack, Dealer
+
+# pandas, plotly and colored are imported only by the commands that use them,
+# so starting the CLI (or a sweep worker) costs the game code and numpy only
+
+
+# players evaluate cannot load from a single entry CSV
+NOT_LOADABLE = {
+    "PlayerBase": "a fixed strategy without an entry",
+    "PlayerDQ": "saved as two tables in separate files",
+}
+
+
+def player_class(name: str):
+    if name == "PlayerActorCritic":
+        return PlayerActorCritic
+    cls = getattr(players, name, None)
+    if not isinstance(cls, type) or not issubclass(cls, players.Player):
+        raise argparse.ArgumentTypeError(f"Unknown player {name}")
+    if cls.policy is players.Player.policy:
+        raise argparse.ArgumentTypeError(f"{name} is an abstract base player")
+    if cls is players.PlayerUser:
+        raise argparse.ArgumentTypeError("PlayerUser is interactive")
+    return cls
+
+
+def loadable_player_class(name: str):
+    cls = player_class(name)
+    if name in NOT_LOADABLE:
+        raise argparse.ArgumentTypeError(f"{name} is {NOT_LOADABLE[name]}")
+    return cls
+
+
+def play(player, num_hands: int):
+    # counts of each result over num_hands hands
+    counts = {WIN: 0, DRAW: 0, LOSE: 0}
+    dealer = Dealer()
+    for _ in range(num_hands):
+        dealer.reset()
+        player.reset()
+        result = BlackJack(dealer, player).play()
+        player.receive_result(result)
+        counts[result] += 1
+    return counts
+
+
+def sweep_point(cls, param: str, value, num_hands: int, eval_hands: int):
+    # one sweep run: train on num_hands hands, then the frozen win rate
+    player = cls(**{param: value})
+    play(player, num_hands)
+    player.freeze()
+    return play(player, eval_hands)[WIN] / eval_hands
+
+
+def train_command(args):
+    from .train import train
+
+    win_rates = train(
+        [cls() for cls in args.players],
+        args.rounds,
+        args.hands,
+        args.prefix,
+    )
+    for name, win_rate in win_rates.items():
+        print(f"{name}: final win rate {win_rate[-1]:.2%}")
+    return 0
+
+
+def evaluate_command(args):
+    player = args.player(args.entry)
+    player.freeze()
+    counts = play(player, args.hands)
+    report = {
+        "player": args.player.__name__,
+        "hands": args.hands,
+        "win": counts[WIN] / args.hands,
+        "draw": counts[DRAW] / args.hands,
+        "lose": counts[LOSE] / args.hands,
+    }
+    if args.log:
+        from .ope import HandLog, evaluate, player_q_table
+
+        report["off_policy"] = evaluate(
+            HandLog.load(args.log), player_q_table(player), args.epsilon
+        )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def sweep_command(args):
+    parameters = inspect.signature(args.player).parameters
+    if args.param not in parameters:
+        args.parser.error(f"{args.player.__name__} has no argument {args.param}")
+    # the default's type parses the values, so only numeric arguments sweep
+    default = parameters[args.param].default
+    if type(default) not in (int, float):
+        args.parser.error(f"{args.param} has no numeric default to sweep over")
+    values = [type(default)(value) for value in args.values]
+    with ProcessPoolExecutor(args.workers) as executor:
+        win_rates = list(
+            executor.map(
+                sweep_point,
+                [args.player] * len(values),
+                [args.param] * len(values),
+                values,
+                [args.hands] * len(values),
+                [args.eval_hands] * len(values),
+            )
+        )
+    print(f"{args.param:<12}{'win rate':>10}")
+    for value, win_rate in zip(values, win_rates):
+        print(f"{value:<12}{win_rate:>10.2%}")
+    return 0
+
+
+def benchmark_command(arguments):
+    from .benchmark import main
+
+    return main(arguments)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m blackjack")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="train players and save entries")
+    train_parser.add_argument(
+        "players", nargs="+", type=player_class, help="player class names"
+    )
+    train_parser.add_argument("--rounds", type=int, default=300)
+    train_parser.add_argument("--hands", type=int, default=1000)
+    train_parser.add_argument("--prefix", default="4")
+    train_parser.set_defaults(run=train_command)
+
+    evaluate_parser = commands.add_parser(
+        "evaluate", help="win rate of a saved entry, played greedily"
+    )
+    evaluate_parser.add_argument(
+        "player", type=loadable_player_class, help="player class name"
+    )
+    evaluate_parser.add_argument(
+        "entry", help="entry CSV, e.g. files/4_PlayerQ_entry.csv"
+    )
+    evaluate_parser.add_argument("--hands", type=int, default=10000)
+    evaluate_parser.add_argument(
+        "--log", help="HandLog .npz for off-policy estimates of the entry"
+    )
+    evaluate_parser.add_argument("--epsilon", type=float, default=0.0)
+    evaluate_parser.set_defaults(run=evaluate_command)
+
+    sweep_parser = commands.add_parser(
+        "sweep", help="train one player per value of a constructor argument"
+    )
+    sweep_parser.add_argument("player", type=player_class, help="player class name")
+    sweep_parser.add_argument("param", help="constructor argument, e.g. alpha")
+    sweep_parser.add_argument("values", nargs="+")
+    sweep_parser.add_argument("--hands", type=int, default=100000)
+    sweep_parser.add_argument("--eval-hands", type=int, default=10000)
+    sweep_parser.add_argument("--workers", type=int)
+    sweep_parser.set_defaults(run=sweep_command, parser=sweep_parser)
+
+    # the benchmark keeps its own options, passed through unparsed
+    commands.add_parser(
+        "benchmark", help="hands/s or startup benchmark, see blackjack.benchmark"
+    )
+
+    args, arguments = parser.parse_known_args(argv)
+    if args.command == "benchmark":
+        return benchmark_command(arguments)
+    if arguments:
+        parser.error(f"unrecognized arguments: {' '.join(arguments)}")
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
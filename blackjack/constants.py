@@ -0,0 +1,8 @@
+WIN = 1
+DRAW = 0
+LOSE = -1
+HIT = 0
+STAY = 1
+
+# state = (ace count, sum of non-ace cards, dealer card)
+STATE_SHAPE = (5, 32, 12)
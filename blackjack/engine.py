@@ -0,0 +1,126 @@
+import random
+
+from .constants import DRAW, HIT, LOSE, STAY, WIN
+from .player import Player
+
+# game narration; the interactive game turns it on, training runs leave it off
+VERBOSE = False
+
+CARDS = [i for i in range(2, 11)] * 4 + [10] * 12 + [11] * 4
+
+
+def set_verbose(verbose: bool):
+    global VERBOSE
+    VERBOSE = verbose
+
+
+def print_colored(text, *args):
+    from colored import Fore, Style
+
+    text = text.replace("Player", f"{Fore.green}Player{Style.reset}")
+    text = text.replace("Dealer", f"{Fore.rgb(255,124,198)}Dealer{Style.reset}")
+    print(text, *args)
+
+
+class Deck:
+    def __init__(self):
+        self.cards = CARDS.copy()
+        random.shuffle(self.cards)
+        self.index = 0
+
+    def deal(self):
+        card = self.cards[self.index]
+        self.index += 1
+        return card
+
+
+class Dealer(Player):
+    def add_card(self, card):
+        self.cards.append(card)
+        self.value += card
+
+    def policy(self):
+        if self.value < 17:
+            return HIT
+        else:
+            return STAY
+
+
+class BlackJack:
+    def __init__(self, dealer: Player, player: Player):
+        self.deck = Deck()
+        self.dealer = dealer
+        self.player = player
+        self.player.add_card(self.deck.deal())
+        self.dealer.add_card(self.deck.deal())
+        self.player.add_card(self.deck.deal())
+        self.dealer.add_card(self.deck.deal())
+        self.player.see(self.dealer.open_card())
+
+    def play(self):
+        # narration is guarded so training runs never build the message strings
+        while True:
+            if VERBOSE:
+                print_colored("Player: ", repr(self.player))
+                print_colored("Dealer: ", repr(self.dealer))
+
+            if self.player.value > 21:
+                if VERBOSE:
+                    print_colored("Player busts")
+                return LOSE
+            elif self.dealer.value > 21:
+                if VERBOSE:
+                    print_colored("Dealer busts")
+                return WIN
+            elif self.player.value == 21:
+                if VERBOSE:
+                    print_colored("Player wins")
+                return WIN
+            elif self.dealer.value == 21:
+                if VERBOSE:
+                    print_colored("Dealer wins")
+                return LOSE
+            else:
+                if VERBOSE:
+                    print_colored("Player's turn")
+                action = self.player.policy()
+
+                if action == STAY:
+                    if VERBOSE:
+                        print_colored("Player stands")
+                        print_colored("Dealer's turn")
+                    while True:
+                        dealer_action = self.dealer.policy()
+                        if dealer_action == STAY:
+                            if VERBOSE:
+                                print_colored("Dealer stands")
+                            break
+                        new_card = self.deck.deal()
+                        self.dealer.add_card(new_card)
+                        if VERBOSE:
+                            print_colored("Dealer gets ", new_card)
+                            print_colored("Dealer: ", repr(self.dealer))
+                    if self.dealer.value > 21:
+                        if VERBOSE:
+                            print_colored("Dealer busts")
+                        return WIN
+                    elif self.dealer.value > self.player.value:
+                        if VERBOSE:
+                            print_colored("Dealer wins")
+                        return LOSE
+                    elif self.dealer.value == self.player.value:
+                        if VERBOSE:
+                            print_colored("Draw")
+                        return DRAW
+                    else:
+                        if VERBOSE:
+                            print_colored("Player wins")
+                        return WIN
+                elif action == HIT:
+                    new_card = self.deck.deal()
+                    self.player.add_card(new_card)
+                    if VERBOSE:
+                        print_colored("Player hits")
+                        print_colored("Player gets ", new_card)
+                else:
+                    raise ValueError("Invalid action")
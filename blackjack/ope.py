@@ -0,0 +1,188 @@
+import numpy as np
+
+from .constants import HIT, STATE_SHAPE, STAY
+
+
+class HandLog:
+    # Logged hands as flat arrays: one row per decision, one length/result per hand.
+    def __init__(self, capacity: int = 1024):
+        self.states = np.zeros((capacity, 3), dtype=np.int8)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.behavior_probs = np.zeros(capacity, dtype=np.float32)
+        self.lengths = np.zeros(capacity, dtype=np.uint8)
+        self.results = np.zeros(capacity, dtype=np.int8)
+        self.num_decisions = 0
+        self.num_hands = 0
+
+    def __len__(self):
+        return self.num_hands
+
+    @staticmethod
+    def grow(array, size):
+        if size <= len(array):
+            return array
+        grown = np.zeros((max(size, 2 * len(array)),) + array.shape[1:], array.dtype)
+        grown[: len(array)] = array
+        return grown
+
+    def add_hand(self, states, actions, behavior_probs, result):
+        end = self.num_decisions + len(actions)
+        self.states = self.grow(self.states, end)
+        self.actions = self.grow(self.actions, end)
+        self.behavior_probs = self.grow(self.behavior_probs, end)
+        self.lengths = self.grow(self.lengths, self.num_hands + 1)
+        self.results = self.grow(self.results, self.num_hands + 1)
+
+        if len(actions):
+            self.states[self.num_decisions : end] = states
+            self.actions[self.num_decisions : end] = actions
+            self.behavior_probs[self.num_decisions : end] = behavior_probs
+        self.lengths[self.num_hands] = len(actions)
+        self.results[self.num_hands] = result
+        self.num_decisions = end
+        self.num_hands += 1
+
+    def arrays(self):
+        return (
+            self.states[: self.num_decisions],
+            self.actions[: self.num_decisions],
+            self.behavior_probs[: self.num_decisions],
+            self.lengths[: self.num_hands],
+            self.results[: self.num_hands],
+        )
+
+    def save(self, file_name: str):
+        states, actions, behavior_probs, lengths, results = self.arrays()
+        np.savez_compressed(
+            file_name,
+            states=states,
+            actions=actions,
+            behavior_probs=behavior_probs,
+            lengths=lengths,
+            results=results,
+        )
+
+    @classmethod
+    def load(cls, file_name: str):
+        data = np.load(file_name)
+        log = cls(capacity=1)
+        log.states = data["states"]
+        log.actions = data["actions"]
+        log.behavior_probs = data["behavior_probs"]
+        log.lengths = data["lengths"]
+        log.results = data["results"]
+        log.num_decisions = len(log.actions)
+        log.num_hands = len(log.lengths)
+        return log
+
+
+def attach(player, sink):
+    # Records every hand the player plays into sink.add_hand(states, actions,
+    # behavior_probs, result). Returns a function that detaches the recorder.
+    policy = player.policy
+    receive_result = player.receive_result
+    hand = []
+
+    def recorded_policy():
+        state = player.get_state()
+        probabilities = player.action_probabilities(state)
+        action = policy()
+        hand.append((state, action, probabilities[action]))
+        return action
+
+    def recorded_receive_result(result):
+        receive_result(result)
+        sink.add_hand(
+            [state for state, _, _ in hand],
+            [action for _, action, _ in hand],
+            [probability for _, _, probability in hand],
+            result,
+        )
+        hand.clear()
+
+    player.policy = recorded_policy
+    player.receive_result = recorded_receive_result
+
+    def detach():
+        del player.policy
+        del player.receive_result
+
+    return detach
+
+
+def load_q_table(file_name: str):
+    # dense (aces, non-ace sum, dealer, action) Q array from a save_entry CSV
+    import pandas as pd
+
+    q_table = np.zeros(STATE_SHAPE + (2,))
+    df = pd.read_csv(file_name)
+    index = (df["Ace"].to_numpy(), df["Value"].to_numpy(), df["Dealer"].to_numpy())
+    q_table[index + (HIT,)] = df["Hit"].to_numpy()
+    q_table[index + (STAY,)] = df["Stay"].to_numpy()
+    return q_table
+
+
+def player_q_table(player):
+    q_table = np.zeros(STATE_SHAPE + (2,))
+    for index in np.ndindex(*STATE_SHAPE):
+        q_table[index] = player.q_values(index)
+    return q_table
+
+
+def target_probabilities(q_table, states, actions, epsilon: float = 0.0):
+    # probability of the logged actions under the epsilon-greedy policy of q_table
+    q = q_table[states[:, 0], states[:, 1], states[:, 2]]
+    q_taken = np.take_along_axis(q, actions[:, None].astype(np.int64), axis=1)[:, 0]
+    q_other = np.take_along_axis(q, 1 - actions[:, None].astype(np.int64), axis=1)[:, 0]
+    greedy = np.where(q_taken > q_other, 1.0, np.where(q_taken < q_other, 0.0, 0.5))
+    return (1 - epsilon) * greedy + epsilon / 2
+
+
+def evaluate(log: HandLog, q_table, epsilon: float = 0.0):
+    # Importance-sampling estimates of the expected hand result under q_table.
+    # The reward arrives after the last decision, so ordinary and per-decision
+    # IS coincide; the weighted variants differ in how they normalise.
+    states, actions, behavior_probs, lengths, results = log.arrays()
+    lengths = lengths.astype(np.int64)
+    results = results.astype(np.float64)
+    num_hands = len(lengths)
+    ratios = target_probabilities(q_table, states.astype(np.int64), actions, epsilon)
+    ratios = ratios / behavior_probs
+
+    # (hands, steps) cumulative weights; padding keeps the last weight, hands
+    # without decisions (naturals) have weight 1 and their reward at step 0
+    steps = max(int(lengths.max(initial=0)), 1)
+    hand = np.repeat(np.arange(num_hands), lengths)
+    step = np.arange(len(ratios)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    padded = np.ones((num_hands, steps))
+    padded[hand, step] = ratios
+    weights = np.cumprod(padded, axis=1)
+
+    final_weights = weights[:, -1]
+    ordinary = np.mean(final_weights * results)
+    weight_sum = final_weights.sum()
+    weighted = (final_weights * results).sum() / weight_sum if weight_sum else 0.0
+
+    rewards = np.zeros((num_hands, steps))
+    rewards[np.arange(num_hands), np.maximum(lengths, 1) - 1] = results
+    per_decision = np.mean((weights * rewards).sum(axis=1))
+    step_weight_sum = weights.sum(axis=0)
+    weighted_per_decision = np.sum(
+        np.divide(
+            (weights * rewards).sum(axis=0),
+            step_weight_sum,
+            out=np.zeros(steps),
+            where=step_weight_sum > 0,
+        )
+    )
+
+    return {
+        "hands": num_hands,
+        "ordinary": float(ordinary),
+        "weighted": float(weighted),
+        "per_decision": float(per_decision),
+        "weighted_per_decision": float(weighted_per_decision),
+        "effective_sample_size": float(
+            weight_sum**2 / np.sum(final_weights**2) if weight_sum else 0.0
+        ),
+    }
@@ -0,0 +1,131 @@
+import random
+
+from .constants import HIT, STATE_SHAPE, STAY
+from .table import state_index
+
+
+class Player:
+    def __init__(self):
+        self.cards = []
+        self.dealer_card = None
+        self.value = 0
+        self.ace_count = 0
+        self.non_ace_sum = 0
+        self.frozen = False
+        self.greedy_cache = None
+        self.cache_version = None
+
+    def load_entry(self, file_name: str):
+        import pandas as pd
+
+        df = pd.read_csv(file_name)
+        for _, row in df.iterrows():
+            self.entry[(row["Ace"], row["Value"], row["Dealer"]), HIT] = row["Hit"], 100
+            self.entry[(row["Ace"], row["Value"], row["Dealer"]), STAY] = (
+                row["Stay"],
+                100,
+            )
+
+    def reset(self):
+        self.cards = []
+        self.dealer_card = None
+        self.value = 0
+        self.ace_count = 0
+        self.non_ace_sum = 0
+
+    def add_card(self, card):
+        # hand totals are kept incrementally instead of recounting the cards
+        self.cards.append(card)
+        if card == 11:
+            self.ace_count += 1
+        else:
+            self.non_ace_sum += card
+        value = self.non_ace_sum + 11 * self.ace_count
+        soft_aces = self.ace_count
+        while value > 21 and soft_aces > 0:
+            value -= 10
+            soft_aces -= 1
+        self.value = value
+
+    def open_card(self):
+        return self.cards[0]
+
+    def see(self, card):
+        self.dealer_card = card
+
+    def policy(self):
+        raise NotImplementedError
+
+    def freeze(self):
+        # evaluation mode: no learning, decisions read from the compiled greedy policy
+        self.frozen = True
+
+    def unfreeze(self):
+        self.frozen = False
+
+    def entry_version(self):
+        return self.entry.version
+
+    def q_values(self, state):
+        q_hit, _ = self.entry.get((state, HIT), (0, 0))
+        q_stay, _ = self.entry.get((state, STAY), (0, 0))
+        return q_hit, q_stay
+
+    def action_probabilities(self, state):
+        # behavior policy (p_hit, p_stay) at state; greedy with random tie-breaks
+        q_hit, q_stay = self.q_values(state)
+        if q_hit > q_stay:
+            return 1.0, 0.0
+        elif q_hit < q_stay:
+            return 0.0, 1.0
+        return 0.5, 0.5
+
+    def compile_policy(self):
+        # greedy action per state index, None where the Q-values tie
+        self.greedy_cache = [None] * (STATE_SHAPE[0] * STATE_SHAPE[1] * STATE_SHAPE[2])
+        for ace in range(STATE_SHAPE[0]):
+            for value in range(STATE_SHAPE[1]):
+                for dealer in range(STATE_SHAPE[2]):
+                    q_hit, q_stay = self.q_values((ace, value, dealer))
+                    if q_hit > q_stay:
+                        action = HIT
+                    elif q_hit < q_stay:
+                        action = STAY
+                    else:
+                        action = None
+                    self.greedy_cache[state_index((ace, value, dealer))] = action
+        self.cache_version = self.entry_version()
+
+    def frozen_policy(self):
+        if self.cache_version != self.entry_version():
+            self.compile_policy()
+        action = self.greedy_cache[state_index(self.get_state())]
+        if action is None:
+            return random.choice([HIT, STAY])
+        return action
+
+    def get_state(self):
+        return (self.ace_count, self.non_ace_sum, self.dealer_card)
+
+    def receive_result(self, result):
+        pass
+
+    def save_entry(self, file_name: str):
+        import pandas as pd
+
+        data = []
+        state_set = set([i[0] for i in self.entry.keys()])
+        for state in sorted(state_set, key=lambda x: (x[0], x[1], x[2])):
+            q_hit, _ = self.entry.get((state, HIT), (0, 0))
+            q_stay, _ = self.entry.get((state, STAY), (0, 0))
+            data.append(
+                [state[0], state[1], state[2], round(q_hit, 3), round(q_stay, 3)]
+            )
+        df = pd.DataFrame(data, columns=["Ace", "Value", "Dealer", "Hit", "Stay"])
+        df.to_csv(f"files/{file_name}.csv", index=False)
+
+    def __repr__(self):
+        return f"{self.cards} ({self.value})"
+
+    def __str__(self):
+        return f"{self.__class__.__name__}"
@@ -0,0 +1,414 @@
+import random
+
+from .constants import HIT, STAY
+from .engine import print_colored
+from .player import Player
+from .table import QTable
+
+
+class PlayerBase(Player):
+    def policy(self):
+        if self.value < 17:
+            return HIT
+        else:
+            return STAY
+
+    def action_probabilities(self, state):
+        value = state[1] + 11 * state[0]
+        soft_aces = state[0]
+        while value > 21 and soft_aces > 0:
+            value -= 10
+            soft_aces -= 1
+        return (1.0, 0.0) if value < 17 else (0.0, 1.0)
+
+    def save_entry(self, file_name: str):
+        pass
+
+
+class PlayerMC(Player):
+    def __init__(self, file_name: str = None):
+        super().__init__()
+        self.entry = QTable()
+        if file_name:
+            self.load_entry(file_name)
+        self.action_history = []
+
+    def policy(self):
+        if self.frozen:
+            return self.frozen_policy()
+        state = self.get_state()
+        q_hit, _ = self.entry.get((state, HIT), (0, 0))
+        q_stay, _ = self.entry.get((state, STAY), (0, 0))
+        if q_hit > q_stay:
+            next_action = HIT
+        elif q_hit < q_stay:
+            next_action = STAY
+        else:
+            next_action = random.choice([HIT, STAY])
+
+        self.action_history.append((state, next_action))
+        return next_action
+
+    def receive_result(self, result):
+        for state, action in self.action_history:
+            q, episode_count = self.entry.get((state, action), (0, 0))
+            episode_count += 1
+            self.entry[(state, action)] = (
+                (q * (episode_count - 1) + result) / episode_count,
+                episode_count,
+            )
+        self.action_history = []
+
+    def update_episodes(self, states, actions, lengths, results):
+        # replays whole hands, e.g. sampled from a replay.EpisodeBuffer
+        for hand_states, hand_actions, length, result in zip(
+            states, actions, lengths, results
+        ):
+            self.action_history = [
+                (tuple(int(i) for i in state), int(action))
+                for state, action in zip(hand_states[:length], hand_actions[:length])
+            ]
+            self.receive_result(int(result))
+
+
+class PlayerSARSA(Player):
+    def __init__(self, file_name: str = None):
+        super().__init__()
+        self.entry = QTable()
+        if file_name:
+            self.load_entry(file_name)
+        self.previous_state = None
+        self.previous_action = None
+        self.episode_count = 0
+
+    def action_probabilities(self, state):
+        p_hit, p_stay = super().action_probabilities(state)
+        if self.frozen:
+            return p_hit, p_stay
+        epsilon = 1 / (self.episode_count + 1)
+        return (1 - epsilon) * p_hit + epsilon / 2, (1 - epsilon) * p_stay + epsilon / 2
+
+    def policy(self):
+        if self.frozen:
+            return self.frozen_policy()
+        state = self.get_state()
+
+        q_hit, _ = self.entry.get((state, HIT), (0, 0))
+        q_stay, _ = self.entry.get((state, STAY), (0, 0))
+        if q_hit > q_stay:
+            next_action = HIT
+        elif q_hit < q_stay:
+            next_action = STAY
+        else:
+            next_action = random.choice([HIT, STAY])
+
+        if random.random() < 1 / (self.episode_count + 1):
+            next_action = random.choice([HIT, STAY])
+
+        if self.previous_action is not None:  # update TD
+            q, episode_count = self.entry.get(
+                (self.previous_state, self.previous_action), (0, 0)
+            )
+            episode_count += 1
+            self.entry[(self.previous_state, self.previous_action)] = (
+                q
+                + 1
+                / episode_count
+                * (0 + self.entry.get((state, next_action), (0, 0))[0] - q),
+                episode_count,
+            )
+
+        self.previous_state = state
+        self.previous_action = next_action
+        return next_action
+
+    def receive_result(self, result):
+        if self.frozen:
+            return
+        state = self.get_state()
+        q, episode_count = self.entry.get(
+            (self.previous_state, self.previous_action), (0, 0)
+        )
+        episode_count += 1
+        self.entry[(self.previous_state, self.previous_action)] = (
+            q
+            + 1
+            / episode_count
+            * (result + self.entry.get((state, STAY), (0, 0))[0] - q),
+            episode_count,
+        )
+
+
+class PlayerQ(Player):
+    def __init__(self, file_name: str = None):
+        super().__init__()
+        self.entry = QTable()
+        if file_name:
+            self.load_entry(file_name)
+        self.previous_state = None
+        self.previous_action = None
+        self.episode_count = 0
+
+    def policy(self):
+        if self.frozen:
+            return self.frozen_policy()
+        state = self.get_state()
+
+        q_hit, _ = self.entry.get((state, HIT), (0, 0))
+        q_stay, _ = self.entry.get((state, STAY), (0, 0))
+        if q_hit > q_stay:
+            next_action = HIT
+        elif q_hit < q_stay:
+            next_action = STAY
+        else:
+            next_action = random.choice([HIT, STAY])
+
+        if self.previous_action is not None:  # update Q
+            q, episode_count = self.entry.get(
+                (self.previous_state, self.previous_action), (0, 0)
+            )
+            episode_count += 1
+            self.entry[(self.previous_state, self.previous_action)] = (
+                q + 1 / episode_count * (0 + max(q_hit, q_stay) - q),
+                episode_count,
+            )
+
+        self.previous_state = state
+        self.previous_action = next_action
+        return next_action
+
+    def receive_result(self, result):
+        if self.frozen:
+            return
+        state = self.get_state()
+        q, episode_count = self.entry.get(
+            (self.previous_state, self.previous_action), (0, 0)
+        )
+        episode_count += 1
+        self.entry[(self.previous_state, self.previous_action)] = (
+            q + 1 / episode_count * (result - q),
+            episode_count,
+        )
+
+
+class PlayerDQ(Player):
+    def __init__(self, file_name: str = None):
+        super().__init__()
+        self.entry = [QTable(), QTable()]
+        if file_name:
+            self.load_entry(file_name)
+        self.previous_state = None
+        self.previous_action = None
+        self.episode_count = 0
+
+    def policy(self):
+        if self.frozen:
+            return self.frozen_policy()
+        flag = random.choice([0, 1])
+        entry = self.entry[flag]
+        other_entry = self.entry[1 - flag]
+        state = self.get_state()
+
+        q_hit, _ = entry.get((state, HIT), (0, 0))
+        q_stay, _ = entry.get((state, STAY), (0, 0))
+        other_q_hit, _ = other_entry.get((state, HIT), (0, 0))
+        other_q_stay, _ = other_entry.get((state, STAY), (0, 0))
+        if q_hit + other_q_hit > q_stay + other_q_stay:
+            next_action = HIT
+        elif q_hit + other_q_hit < q_stay + other_q_stay:
+            next_action = STAY
+        else:
+            next_action = random.choice([HIT, STAY])
+        if q_hit > q_stay:
+            best_action = HIT
+        elif q_hit < q_stay:
+            best_action = STAY
+        else:
+            best_action = random.choice([HIT, STAY])
+
+        if self.previous_action is not None:  # update Q
+            q, episode_count = other_entry.get(
+                (self.previous_state, self.previous_action), (0, 0)
+            )
+            episode_count += 1
+            entry[(self.previous_state, self.previous_action)] = (
+                q
+                + 1
+                / episode_count
+                * (0 + other_entry.get((state, best_action), (0, 0))[0] - q),
+                episode_count,
+            )
+
+        self.previous_state = state
+        self.previous_action = next_action
+        return next_action
+
+    def receive_result(self, result):
+        if self.frozen:
+            return
+        flag = random.choice([0, 1])
+        entry = self.entry[flag]
+        other_entry = self.entry[1 - flag]
+
+        state = self.get_state()
+        q, episode_count = other_entry.get(
+            (self.previous_state, self.previous_action), (0, 0)
+        )
+        episode_count += 1
+        entry[(self.previous_state, self.previous_action)] = (
+            q + 1 / episode_count * (result - q),
+            episode_count,
+        )
+
+    def entry_version(self):
+        return (self.entry[0].version, self.entry[1].version)
+
+    def q_values(self, state):
+        q_hit = self.entry[0].get((state, HIT), (0, 0))[0]
+        q_hit += self.entry[1].get((state, HIT), (0, 0))[0]
+        q_stay = self.entry[0].get((state, STAY), (0, 0))[0]
+        q_stay += self.entry[1].get((state, STAY), (0, 0))[0]
+        return q_hit, q_stay
+
+    def save_entry(self, file_name: str):
+        import pandas as pd
+
+        for i, entry in enumerate(self.entry):
+            data = []
+            state_set = set([i[0] for i in entry.keys()])
+            for state in sorted(state_set, key=lambda x: (x[0], x[1], x[2])):
+                q_hit, _ = entry.get((state, HIT), (0, 0))
+                q_stay, _ = entry.get((state, STAY), (0, 0))
+                data.append(
+                    [state[0], state[1], state[2], round(q_hit, 3), round(q_stay, 3)]
+                )
+            df = pd.DataFrame(data, columns=["Ace", "Value", "Dealer", "Hit", "Stay"])
+            df.to_csv(f"files/{file_name}_{i}.csv", index=False)
+
+
+class PlayerLambda(Player):
+    # Shared eligibility-trace machinery for SARSA(lambda) and Watkins Q(lambda).
+    # Traces are kept only for (state, action) pairs seen in the current hand and
+    # decay lazily: the stored value is e / trace_scale and every step only
+    # multiplies trace_scale by gamma * lambda.
+    def __init__(
+        self,
+        file_name: str = None,
+        alpha: float = 0.05,
+        epsilon: float = 0.1,
+        gamma: float = 1.0,
+        lambda_: float = 0.9,
+    ):
+        super().__init__()
+        self.entry = QTable()
+        if file_name:
+            self.load_entry(file_name)
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.gamma = gamma
+        self.lambda_ = lambda_
+        self.traces = {}
+        self.trace_scale = 1.0
+        self.previous_state = None
+        self.previous_action = None
+
+    def greedy_action(self, state):
+        q_hit, _ = self.entry.get((state, HIT), (0, 0))
+        q_stay, _ = self.entry.get((state, STAY), (0, 0))
+        if q_hit > q_stay:
+            return HIT, q_hit
+        elif q_hit < q_stay:
+            return STAY, q_stay
+        else:
+            return random.choice([HIT, STAY]), q_hit
+
+    def action_probabilities(self, state):
+        p_hit, p_stay = super().action_probabilities(state)
+        if self.frozen:
+            return p_hit, p_stay
+        epsilon = self.epsilon
+        return (1 - epsilon) * p_hit + epsilon / 2, (1 - epsilon) * p_stay + epsilon / 2
+
+    def set_trace(self, state, action):
+        # replacing trace
+        self.traces[(state, action)] = 1 / self.trace_scale
+        q, count = self.entry.get((state, action), (0, 0))
+        self.entry[(state, action)] = (q, count + 1)
+
+    def apply_traces(self, target):
+        q, _ = self.entry.get((self.previous_state, self.previous_action), (0, 0))
+        step = self.alpha * (target - q) * self.trace_scale
+        for key, trace in self.traces.items():
+            q, count = self.entry.get(key, (0, 0))
+            self.entry[key] = (q + step * trace, count)
+        self.trace_scale *= self.gamma * self.lambda_
+        if self.trace_scale < 1e-100:
+            self.traces = {
+                key: trace * self.trace_scale for key, trace in self.traces.items()
+            }
+            self.trace_scale = 1.0
+
+    def clear_traces(self):
+        self.traces = {}
+        self.trace_scale = 1.0
+
+    def receive_result(self, result):
+        if self.frozen:
+            return
+        if self.previous_action is not None:
+            self.apply_traces(result)
+        self.clear_traces()
+        self.previous_state = None
+        self.previous_action = None
+
+
+class PlayerSARSALambda(PlayerLambda):
+    def policy(self):
+        if self.frozen:
+            return self.frozen_policy()
+        state = self.get_state()
+        next_action, _ = self.greedy_action(state)
+        if random.random() < self.epsilon:
+            next_action = random.choice([HIT, STAY])
+
+        if self.previous_action is not None:  # update TD(lambda)
+            q_next, _ = self.entry.get((state, next_action), (0, 0))
+            self.apply_traces(0 + self.gamma * q_next)
+
+        self.set_trace(state, next_action)
+        self.previous_state = state
+        self.previous_action = next_action
+        return next_action
+
+
+class PlayerQLambda(PlayerLambda):
+    def policy(self):
+        if self.frozen:
+            return self.frozen_policy()
+        state = self.get_state()
+        best_action, q_best = self.greedy_action(state)
+        next_action = best_action
+        if random.random() < self.epsilon:
+            next_action = random.choice([HIT, STAY])
+
+        if self.previous_action is not None:  # update Q(lambda)
+            self.apply_traces(0 + self.gamma * q_best)
+            if next_action != best_action:  # Watkins: cut traces after exploring
+                q_next, _ = self.entry.get((state, next_action), (0, 0))
+                if q_next != q_best:
+                    self.clear_traces()
+
+        self.set_trace(state, next_action)
+        self.previous_state = state
+        self.previous_action = next_action
+        return next_action
+
+
+class PlayerUser(Player):
+    def policy(self):
+        print_colored("Dealer's card: ", self.dealer_card)
+        action = input("Hit or stay? (h/s): ")
+        if action == "h":
+            return HIT
+        else:
+            return STAY
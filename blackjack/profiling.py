@@ -0,0 +1,176 @@
+import argparse
+import collections
+import contextlib
+import cProfile
+import pstats
+import sys
+import threading
+import time
+
+from . import engine
+
+
+class Profiler:
+    # Opt-in instrumentation for the training loop. Nothing is patched until
+    # instrument() is called, so an unprofiled run executes the original methods.
+    def __init__(self):
+        self.total_ns = collections.Counter()
+        self.calls = collections.Counter()
+        self.rounds = []
+        self.round_start = (collections.Counter(), collections.Counter())
+        self.patched = []
+
+    def wrap(self, owner, attribute: str, name: str = None):
+        name = name or attribute
+        function = getattr(owner, attribute)
+        total_ns = self.total_ns
+        calls = self.calls
+
+        def wrapper(*args, **kwargs):
+            begin = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                total_ns[name] += time.perf_counter_ns() - begin
+                calls[name] += 1
+
+        # instance attributes shadow the class method; classes keep the original
+        self.patched.append((owner, attribute, owner.__dict__.get(attribute)))
+        setattr(owner, attribute, wrapper)
+
+    def instrument(self, player, dealer):
+        self.wrap(engine.Deck, "__init__", "deck_setup")
+        self.wrap(player, "add_card")
+        self.wrap(dealer, "add_card", "dealer_add_card")
+        self.wrap(player, "policy")
+        self.wrap(player, "receive_result")
+        self.wrap(player, "save_entry")
+
+    def restore(self):
+        for owner, attribute, original in reversed(self.patched):
+            if original is None:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        self.patched = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        begin = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.total_ns[name] += time.perf_counter_ns() - begin
+            self.calls[name] += 1
+
+    def end_round(self):
+        total_ns, calls = self.round_start
+        self.rounds.append(
+            {
+                name: (
+                    self.total_ns[name] - total_ns[name],
+                    self.calls[name] - calls[name],
+                )
+                for name in self.total_ns
+            }
+        )
+        self.round_start = (self.total_ns.copy(), self.calls.copy())
+
+    def report(self):
+        lines = [f"{'phase':<20}{'calls':>12}{'total ms':>12}{'ns/call':>12}"]
+        for name, ns in self.total_ns.most_common():
+            calls = self.calls[name]
+            lines.append(f"{name:<20}{calls:>12}{ns / 1e6:>12.1f}{ns / calls:>12.0f}")
+        return "\n".join(lines)
+
+
+class SamplingProfiler:
+    # Samples the stack of the profiled thread from a background thread.
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.stopped = threading.Event()
+
+    def sample(self, thread_id):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                code = frame.f_code
+                self.samples[(code.co_filename, code.co_firstlineno, code.co_name)] += 1
+
+    def run(self, function, *args, **kwargs):
+        sampler = threading.Thread(
+            target=self.sample, args=(threading.get_ident(),), daemon=True
+        )
+        sampler.start()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.stopped.set()
+            sampler.join()
+
+    def report(self, limit: int = 20):
+        total = sum(self.samples.values()) or 1
+        lines = [f"{'samples':>8}{'%':>7}  function"]
+        for (filename, lineno, name), count in self.samples.most_common(limit):
+            lines.append(
+                f"{count:>8}{count / total * 100:>7.1f}  {name} ({filename}:{lineno})"
+            )
+        return "\n".join(lines)
+
+
+def profile_run(function, mode: str, output: str = None, *args, **kwargs):
+    # mode: "cprofile" or "sampling"; the report is printed and optionally saved
+    if mode == "cprofile":
+        profile = cProfile.Profile()
+        result = profile.runcall(function, *args, **kwargs)
+        if output:
+            profile.dump_stats(output)
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(20)
+    elif mode == "sampling":
+        profiler = SamplingProfiler()
+        result = profiler.run(function, *args, **kwargs)
+        report = profiler.report()
+        if output:
+            with open(output, "w") as f:
+                f.write(report + "\n")
+        print(report)
+    else:
+        raise ValueError(f"Unknown profiler: {mode}")
+    return result
+
+
+def main(argv=None):
+    from .cli import player_class
+    from .train import train
+
+    parser = argparse.ArgumentParser(description="Profile a blackjack training run")
+    parser.add_argument(
+        "player", type=player_class, help="player class name, e.g. PlayerQ"
+    )
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--hands", type=int, default=1000)
+    parser.add_argument("--prefix", default="4")
+    parser.add_argument("--mode", choices=["timers", "cprofile", "sampling"])
+    parser.add_argument("--output", help="cProfile stats or sampling report file")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler()
+    run = lambda: train(
+        [args.player()], args.rounds, args.hands, args.prefix, profiler=profiler
+    )
+    if args.mode in ("cprofile", "sampling"):
+        profile_run(run, args.mode, args.output)
+    else:
+        run()
+
+    print(profiler.report())
+    for round_, breakdown in enumerate(profiler.rounds):
+        phases = ", ".join(
+            f"{name} {ns / 1e6:.1f}ms" for name, (ns, _) in sorted(breakdown.items())
+        )
+        print(f"Round {round_ + 1}: {phases}")
+
+
+if __name__ == "__main__":
+    main()
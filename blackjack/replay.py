@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class EpisodeBuffer:
+    # Ring buffer of whole hands in preallocated arrays; the oldest hand is
+    # overwritten once capacity is reached. Implements the ope.attach sink.
+    def __init__(self, capacity: int, max_length: int = 12, seed: int = None):
+        self.capacity = capacity
+        self.max_length = max_length
+        self.states = np.zeros((capacity, max_length, 3), dtype=np.int8)
+        self.actions = np.zeros((capacity, max_length), dtype=np.int8)
+        self.behavior_probs = np.zeros((capacity, max_length), dtype=np.float32)
+        self.lengths = np.zeros(capacity, dtype=np.uint8)
+        self.results = np.zeros(capacity, dtype=np.int8)
+        self.priorities = np.zeros(capacity, dtype=np.float32)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add_hand(self, states, actions, behavior_probs, result, priority=None):
+        length = len(actions)
+        if length > self.max_length:
+            raise ValueError(f"Hand of {length} decisions exceeds {self.max_length}")
+        i = self.position
+        if length:
+            self.states[i, :length] = states
+            self.actions[i, :length] = actions
+            self.behavior_probs[i, :length] = behavior_probs
+        self.lengths[i] = length
+        self.results[i] = result
+        if priority is None:
+            priority = self.priorities[: self.size].max(initial=1.0)
+        self.priorities[i] = priority
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample_indices(self, batch_size: int, prioritized: bool = False, alpha=0.6):
+        if not prioritized:
+            return self.rng.integers(0, self.size, batch_size)
+        weights = self.priorities[: self.size].astype(np.float64) ** alpha
+        return self.rng.choice(self.size, batch_size, p=weights / weights.sum())
+
+    def get(self, indices):
+        # (states, actions, lengths, results) as taken by update_episodes
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.lengths[indices],
+            self.results[indices],
+        )
+
+    def sample(self, batch_size: int, prioritized: bool = False, alpha=0.6):
+        indices = self.sample_indices(batch_size, prioritized, alpha)
+        return indices, self.get(indices)
+
+    def update_priorities(self, indices, priorities):
+        self.priorities[indices] = priorities
+
+    def save(self, file_name: str):
+        order = (np.arange(self.size) + self.position - self.size) % self.capacity
+        np.savez_compressed(
+            file_name,
+            states=self.states[order],
+            actions=self.actions[order],
+            behavior_probs=self.behavior_probs[order],
+            lengths=self.lengths[order],
+            results=self.results[order],
+            priorities=self.priorities[order],
+        )
+
+    @classmethod
+    def load(cls, file_name: str, capacity: int = None, seed: int = None):
+        data = np.load(file_name)
+        size = len(data["lengths"])
+        capacity = max(capacity or size, 1)
+        buffer = cls(capacity, data["states"].shape[1], seed)
+        keep = slice(max(size - capacity, 0), size)
+        buffer.size = min(size, capacity)
+        buffer.position = buffer.size % capacity
+        for name in (
+            "states",
+            "actions",
+            "behavior_probs",
+            "lengths",
+            "results",
+            "priorities",
+        ):
+            getattr(buffer, name)[: buffer.size] = data[name][keep]
+        return buffer
+
+
+def replay(player, buffer: EpisodeBuffer, batch_size: int, prioritized=False):
+    # one experience-replay step for a player with update_episodes
+    indices, episodes = buffer.sample(batch_size, prioritized)
+    player.update_episodes(*episodes)
+    return indices
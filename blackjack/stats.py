@@ -0,0 +1,133 @@
+import collections
+import math
+
+
+class RunningStats:
+    # Welford's streaming mean and variance
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def pop(self, x: float):
+        # removes a value previously pushed, for sliding windows
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = x - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 -= delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        return max(self.m2, 0.0) / (self.count - 1)
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def confidence_interval(self, z: float = 1.96):
+        half_width = z * self.std / math.sqrt(self.count) if self.count else math.inf
+        return self.mean - half_width, self.mean + half_width
+
+
+class WindowStats(RunningStats):
+    # RunningStats over the last `size` values
+    def __init__(self, size: int):
+        super().__init__()
+        self.values = collections.deque(maxlen=size)
+
+    def push(self, x: float):
+        if len(self.values) == self.values.maxlen:
+            self.pop(self.values[0])
+        self.values.append(x)
+        super().push(x)
+
+    def full(self):
+        return len(self.values) == self.values.maxlen
+
+
+class PageHinkley:
+    # Page-Hinkley test for a shift in the mean of a stream (either direction)
+    def __init__(self, delta: float = 0.005, threshold: float = 0.05):
+        self.delta = delta
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        self.stats = RunningStats()
+        self.up = self.up_min = 0.0
+        self.down = self.down_max = 0.0
+
+    def update(self, x: float) -> bool:
+        self.stats.push(x)
+        deviation = x - self.stats.mean
+        self.up += deviation - self.delta
+        self.up_min = min(self.up_min, self.up)
+        self.down += deviation + self.delta
+        self.down_max = max(self.down_max, self.down)
+        if (
+            self.up - self.up_min > self.threshold
+            or self.down_max - self.down > self.threshold
+        ):
+            self.reset()
+            return True
+        return False
+
+
+class EarlyStopping:
+    # Stops training once the round win rate has plateaued: the last two windows
+    # of rounds agree within `tolerance` and the latest window's confidence
+    # interval is narrower than `tolerance`. A detected change restarts the wait.
+    def __init__(
+        self,
+        window: int = 20,
+        tolerance: float = 0.02,
+        min_rounds: int = 0,
+        z: float = 1.96,
+        change_detector: PageHinkley = None,
+    ):
+        self.window = window
+        self.tolerance = tolerance
+        self.min_rounds = min_rounds
+        self.z = z
+        self.change_detector = change_detector
+        self.reset()
+
+    def reset(self):
+        self.rounds = 0
+        self.overall = RunningStats()
+        self.previous = WindowStats(self.window)
+        self.latest = WindowStats(self.window)
+        if self.change_detector is not None:
+            self.change_detector.reset()
+
+    def update(self, win_rate: float) -> bool:
+        self.rounds += 1
+        self.overall.push(win_rate)
+        if self.latest.full():
+            self.previous.push(self.latest.values[0])
+        self.latest.push(win_rate)
+
+        if self.change_detector is not None and self.change_detector.update(win_rate):
+            self.previous = WindowStats(self.window)
+            self.latest = WindowStats(self.window)
+            self.latest.push(win_rate)
+            return False
+
+        if self.rounds < self.min_rounds or not self.previous.full():
+            return False
+        low, high = self.latest.confidence_interval(self.z)
+        return (
+            abs(self.latest.mean - self.previous.mean) < self.tolerance
+            and high - low < self.tolerance
+        )
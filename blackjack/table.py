@@ -0,0 +1,16 @@
+from .constants import STATE_SHAPE
+
+
+def state_index(state):
+    return (state[0] * STATE_SHAPE[1] + state[1]) * STATE_SHAPE[2] + state[2]
+
+
+class QTable(dict):
+    # dict of (state, action) -> (q, count) whose version changes on every write
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        self.version += 1
+        super().__setitem__(key, value)
@@ -0,0 +1,62 @@
+from . import engine
+from .constants import WIN
+from .engine import BlackJack, Dealer
+
+
+def train(
+    players,
+    num_round: int,
+    num_episode_per_round: int,
+    prefix: str,
+    profiler=None,
+    early_stopping=None,
+):
+    # prefix tags the exercise in the output files, e.g. files/4_PlayerQ_entry.csv
+    # profiler: optional profiling.Profiler; without one nothing is instrumented
+    # early_stopping: optional stats.EarlyStopping, reset for every player
+    # Returns each player's per-round win rates by class name; the entry
+    # points turn them into plots with render.write_win_rate.
+    dealer = Dealer()
+    win_rates = {}
+    for player in players:
+        print(f"===== {player.__class__.__name__} =====")
+        if early_stopping is not None:
+            early_stopping.reset()
+        if profiler is not None:
+            profiler.instrument(player, dealer)
+
+        win_rate = []
+        for round_ in range(num_round):
+            win_count = 0
+            for i in range(num_episode_per_round):
+                if engine.VERBOSE:
+                    engine.print_colored(f"===== GAME {i+1} =====")
+                dealer.reset()
+                player.reset()
+                game = BlackJack(dealer, player)
+                result = game.play()
+                player.receive_result(result)
+                if result == WIN:
+                    win_count += 1
+
+            player.save_entry(f"{prefix}_{player.__class__.__name__}_entry")
+
+            win_rate.append(win_count / num_episode_per_round)
+            if (round_ + 1) % 10 == 0:
+                print(
+                    f"Round: {round_+1} Win rate: {round(win_count / num_episode_per_round * 100, 3)}%"
+                )
+            if profiler is not None:
+                profiler.end_round()
+            if early_stopping is not None and early_stopping.update(win_rate[-1]):
+                low, high = early_stopping.latest.confidence_interval(early_stopping.z)
+                print(
+                    f"Converged at round {round_+1}: win rate {early_stopping.latest.mean:.2%} "
+                    f"({low:.2%} - {high:.2%})"
+                )
+                break
+
+        win_rates[player.__class__.__name__] = win_rate
+        if profiler is not None:
+            profiler.restore()
+    return win_rates
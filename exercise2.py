@@ -1,27 +1,115 @@
 import math
 import random
+from collections import deque
 
-import pandas as pd
+import numpy as np
 
 
 class Arm:
     def __init__(self, p: float):
         self.p = p
 
-    def pull(self):
-        return 1 if random.random() < self.p else 0
+    def mean(self, context: list[float] = None) -> float:
+        return self.p
+
+    def pull(self, context: list[float] = None):
+        return 1 if random.random() < self.mean(context) else 0
+
+    def step(self) -> None:
+        # called for every arm once per time step, pulled or not
+        pass
+
+
+class DriftingArm(Arm):
+    # p follows a gaussian random walk, reflected back into [0, 1]
+    def __init__(self, p: float, sigma: float = 0.01):
+        super().__init__(p)
+        self.sigma = sigma
+
+    def step(self) -> None:
+        p = self.p + random.gauss(0, self.sigma)
+        p = abs(p)
+        self.p = 2 - p if p > 1 else p
+
+
+class RestlessArm(Arm):
+    # p jumps to a fresh uniform value with probability switch_probability
+    def __init__(self, p: float, switch_probability: float = 0.001):
+        super().__init__(p)
+        self.switch_probability = switch_probability
+
+    def step(self) -> None:
+        if random.random() < self.switch_probability:
+            self.p = random.random()
+
+
+class ContextualArm(Arm):
+    # success probability is linear in the context, clipped to [0, 1]
+    def __init__(self, theta: list[float]):
+        super().__init__(0.0)
+        self.theta = theta
+
+    def mean(self, context: list[float] = None) -> float:
+        if context is None:
+            return self.p
+        return min(max(sum(t * x for t, x in zip(self.theta, context)), 0.0), 1.0)
+
+
+def uniform_contexts(dimension: int):
+    # context generator for simulate: a bias feature and uniform features
+    return lambda: [1.0] + [random.random() for _ in range(dimension - 1)]
 
 
 class Policy:
     def __init__(self, arms: list[Arm]):
         self.arms = arms
 
+    def observe(self, context: list[float]) -> None:
+        # context of the coming select_arm; only contextual policies use it
+        pass
+
     def select_arm(self) -> int:
         raise NotImplementedError
 
     def update(self, arm: int, reward: float) -> None:
         raise NotImplementedError
 
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        # B arms for one request, chosen without feedback in between;
+        # contexts holds one context per arm for contextual policies
+        selected = []
+        for i in range(B):
+            if contexts is not None:
+                self.observe(contexts[i])
+            selected.append(self.select_arm())
+        return selected
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        # delayed feedback in bulk; same state as calling update in order
+        for i, (arm, reward) in enumerate(zip(arms, rewards)):
+            if contexts is not None:
+                self.observe(contexts[i])
+            self.update(int(arm), reward)
+
+
+def batch_counts(num_arms: int, arms, rewards):
+    # pulls and reward sums per arm in a batch of feedback
+    arms = np.asarray(arms, dtype=np.int64)
+    rewards = np.asarray(rewards, dtype=np.float64)
+    return (
+        np.bincount(arms, minlength=num_arms),
+        np.bincount(arms, weights=rewards, minlength=num_arms),
+    )
+
+
+def sample_mean_update(N: list[int], Q: list[float], counts, sums):
+    # n sample-average updates of one arm in a single step:
+    # Q' = (Q * N + sum) / (N + n) = Q + (sum - n * Q) / (N + n)
+    Q = np.array(Q)
+    N = np.array(N) + counts
+    Q += np.divide(sums - counts * Q, N, out=np.zeros(len(Q)), where=N > 0)
+    return N.tolist(), Q.tolist()
+
 
 class Greedy(Policy):
     def __init__(self, arms: list[Arm]):
@@ -36,6 +124,13 @@ class Greedy(Policy):
         self.N[arm] += 1
         self.Q[arm] += (1 / self.N[arm]) * (reward - self.Q[arm])
 
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        return [self.select_arm()] * B
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        counts, sums = batch_counts(len(self.arms), arms, rewards)
+        self.N, self.Q = sample_mean_update(self.N, self.Q, counts, sums)
+
 
 class EpsilonGreedy(Policy):
     def __init__(self, arms: list[Arm], epsilon: float):
@@ -54,6 +149,15 @@ class EpsilonGreedy(Policy):
         self.N[arm] += 1
         self.Q[arm] += (1 / self.N[arm]) * (reward - self.Q[arm])
 
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        explore = np.random.random(B) < self.epsilon
+        random_arms = np.random.randint(0, len(self.arms), B)
+        return np.where(explore, random_arms, self.Q.index(max(self.Q))).tolist()
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        counts, sums = batch_counts(len(self.arms), arms, rewards)
+        self.N, self.Q = sample_mean_update(self.N, self.Q, counts, sums)
+
 
 class UCB(Policy):
     def __init__(self, arms: list[Arm]):
@@ -73,6 +177,20 @@ class UCB(Policy):
                 math.log(sum(self.N)) / (2 * self.N[i] + 1)
             )
 
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        return [self.select_arm()] * B
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        # QU only depends on the final N and Q, so it is recomputed once
+        counts, sums = batch_counts(len(self.arms), arms, rewards)
+        if not counts.any():
+            return
+        self.N, self.Q = sample_mean_update(self.N, self.Q, counts, sums)
+        for i in range(len(self.QU)):
+            self.QU[i] = self.Q[i] + math.sqrt(
+                math.log(sum(self.N)) / (2 * self.N[i] + 1)
+            )
+
 
 class ThompsonSampling(Policy):
     def __init__(self, arms: list[Arm]):
@@ -96,20 +214,361 @@ class ThompsonSampling(Policy):
         self.S[arm] = self.S[arm] + 1
         self.F[arm] = self.F[arm] + 1
 
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        # B independent posterior draws, one row per selection
+        samples = np.random.beta(
+            np.array(self.S) + 1, np.array(self.F) + 1, (B, len(self.arms))
+        )
+        return samples.argmax(axis=1).tolist()
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        # as update: S or F counts the result and both also count the pull
+        counts, successes = batch_counts(len(self.arms), arms, np.asarray(rewards) == 1)
+        successes = successes.astype(np.int64)
+        self.N = (np.array(self.N) + counts).tolist()
+        self.S = (np.array(self.S) + successes + counts).tolist()
+        self.F = (np.array(self.F) + counts - successes + counts).tolist()
+
+
+class ConstantStepEpsilonGreedy(EpsilonGreedy):
+    # exponential recency-weighted average, tracks arms whose p drifts
+    def __init__(self, arms: list[Arm], epsilon: float, alpha: float = 0.1):
+        super().__init__(arms, epsilon)
+        self.alpha = alpha
+
+    def update(self, arm: int, reward: float) -> None:
+        self.N[arm] += 1
+        self.Q[arm] += self.alpha * (reward - self.Q[arm])
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        # after n updates of an arm Q = (1 - alpha)^n Q + sum over its rewards
+        # of alpha (1 - alpha)^(pulls of that arm after the reward)
+        arms = np.asarray(arms, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        counts = np.bincount(arms, minlength=len(self.arms))
+        order = np.argsort(arms, kind="stable")
+        rank = np.empty(len(arms), dtype=np.int64)
+        rank[order] = np.arange(len(arms)) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        later = counts[arms] - 1 - rank
+        weights = self.alpha * (1 - self.alpha) ** later
+        Q = (1 - self.alpha) ** counts * np.array(self.Q)
+        Q += np.bincount(arms, weights=weights * rewards, minlength=len(self.arms))
+        self.Q = Q.tolist()
+        self.N = (np.array(self.N) + counts).tolist()
+
+
+def upper_confidence_arm(N: list[float], S: list[float]) -> int:
+    # UCB's index on (possibly windowed or discounted) pull counts and reward sums
+    total = max(sum(N), 1)
+    QU = [
+        (S[i] / N[i] if N[i] else 0.0) + math.sqrt(math.log(total) / (2 * N[i] + 1))
+        for i in range(len(N))
+    ]
+    return QU.index(max(QU))
+
+
+def thompson_arm(N: list[float], S: list[float]) -> int:
+    Q = [random.betavariate(S[i] + 1, N[i] - S[i] + 1) for i in range(len(N))]
+    return Q.index(max(Q))
+
+
+def thompson_arms(N: list[float], S: list[float], B: int) -> list[int]:
+    N, S = np.array(N), np.array(S)
+    return np.random.beta(S + 1, N - S + 1, (B, len(N))).argmax(axis=1).tolist()
+
+
+class SlidingWindowPolicy(Policy):
+    # pull counts and reward sums over the last window pulls only
+    def __init__(self, arms: list[Arm], window: int = 100):
+        super().__init__(arms)
+        self.window = window
+        self.history = deque()
+        self.N = [0] * len(arms)
+        self.S = [0.0] * len(arms)
+
+    def update(self, arm: int, reward: float) -> None:
+        self.history.append((arm, reward))
+        self.N[arm] += 1
+        self.S[arm] += reward
+        if len(self.history) > self.window:
+            old_arm, old_reward = self.history.popleft()
+            self.N[old_arm] -= 1
+            self.S[old_arm] -= old_reward
 
-def simulate(policy: Policy, arms: list[Arm], num_trials: int, num_time_steps: int):
+
+class DiscountedPolicy(Policy):
+    # pull counts and reward sums where older pulls weigh gamma ** age
+    def __init__(self, arms: list[Arm], gamma: float = 0.99):
+        super().__init__(arms)
+        self.gamma = gamma
+        self.N = [0.0] * len(arms)
+        self.S = [0.0] * len(arms)
+
+    def update(self, arm: int, reward: float) -> None:
+        for i in range(len(self.arms)):
+            self.N[i] *= self.gamma
+            self.S[i] *= self.gamma
+        self.N[arm] += 1
+        self.S[arm] += reward
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        # the i-th of n rewards is discounted n - 1 - i more times
+        arms = np.asarray(arms, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        n = len(arms)
+        weights = self.gamma ** np.arange(n - 1, -1, -1)
+        self.N = (
+            self.gamma**n * np.array(self.N)
+            + np.bincount(arms, weights=weights, minlength=len(self.arms))
+        ).tolist()
+        self.S = (
+            self.gamma**n * np.array(self.S)
+            + np.bincount(arms, weights=weights * rewards, minlength=len(self.arms))
+        ).tolist()
+
+
+class SlidingWindowUCB(SlidingWindowPolicy):
+    def select_arm(self) -> int:
+        return upper_confidence_arm(self.N, self.S)
+
+
+class SlidingWindowThompsonSampling(SlidingWindowPolicy):
+    def select_arm(self) -> int:
+        return thompson_arm(self.N, self.S)
+
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        return thompson_arms(self.N, self.S, B)
+
+
+class DiscountedUCB(DiscountedPolicy):
+    def select_arm(self) -> int:
+        return upper_confidence_arm(self.N, self.S)
+
+
+class DiscountedThompsonSampling(DiscountedPolicy):
+    def select_arm(self) -> int:
+        return thompson_arm(self.N, self.S)
+
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        return thompson_arms(self.N, self.S, B)
+
+
+class LinUCB(Policy):
+    # Disjoint LinUCB: a ridge regression of reward on context per arm. The
+    # inverse of A = ridge * I + sum x x^T is kept directly and updated with
+    # Sherman-Morrison, so a step costs O(d^2) per arm instead of an inversion.
+    def __init__(
+        self, arms: list[Arm], dimension: int, alpha: float = 1.0, ridge: float = 1.0
+    ):
+        super().__init__(arms)
+        self.dimension = dimension
+        self.alpha = alpha
+        self.N = [0] * len(arms)
+        self.A_inv = [
+            [
+                [1 / ridge if i == j else 0.0 for j in range(dimension)]
+                for i in range(dimension)
+            ]
+            for _ in arms
+        ]
+        self.b = [[0.0] * dimension for _ in arms]
+        self.context = [0.0] * dimension
+
+    def observe(self, context: list[float]) -> None:
+        self.context = context
+
+    def select_arm(self) -> int:
+        x = self.context
+        QU = []
+        for A_inv, b in zip(self.A_inv, self.b):
+            A_inv_x = [sum(a * xi for a, xi in zip(row, x)) for row in A_inv]
+            # theta . x = (A_inv b) . x = b . (A_inv x), A_inv being symmetric
+            mean = sum(bi * v for bi, v in zip(b, A_inv_x))
+            variance = sum(xi * v for xi, v in zip(x, A_inv_x))
+            QU.append(mean + self.alpha * math.sqrt(max(variance, 0.0)))
+        return QU.index(max(QU))
+
+    def update(self, arm: int, reward: float) -> None:
+        x = self.context
+        A_inv = self.A_inv[arm]
+        A_inv_x = [sum(a * xi for a, xi in zip(row, x)) for row in A_inv]
+        denominator = 1 + sum(xi * v for xi, v in zip(x, A_inv_x))
+        for i in range(self.dimension):
+            scale = A_inv_x[i] / denominator
+            row = A_inv[i]
+            for j in range(self.dimension):
+                row[j] -= scale * A_inv_x[j]
+        for i in range(self.dimension):
+            self.b[arm][i] += reward * x[i]
+        self.N[arm] += 1
+
+    def select_arms(self, B: int, contexts=None) -> list[int]:
+        X = np.array(contexts if contexts is not None else [self.context] * B)
+        QU = np.empty((B, len(self.arms)))
+        for arm, (A_inv, b) in enumerate(zip(self.A_inv, self.b)):
+            A_inv_X = X @ np.array(A_inv)
+            variance = np.maximum((A_inv_X * X).sum(axis=1), 0.0)
+            QU[:, arm] = A_inv_X @ np.array(b) + self.alpha * np.sqrt(variance)
+        return QU.argmax(axis=1).tolist()
+
+    def update_many(self, arms, rewards, contexts=None) -> None:
+        # Woodbury: the k contexts of an arm form one rank-k update,
+        # A_inv -= A_inv X^T (I + X A_inv X^T)^-1 X A_inv
+        arms = np.asarray(arms, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        X = np.array(contexts if contexts is not None else [self.context] * len(arms))
+        for arm in np.unique(arms):
+            X_arm = X[arms == arm]
+            A_inv = np.array(self.A_inv[arm])
+            A_inv_Xt = A_inv @ X_arm.T
+            inner = np.eye(len(X_arm)) + X_arm @ A_inv_Xt
+            A_inv -= A_inv_Xt @ np.linalg.solve(inner, A_inv_Xt.T)
+            self.A_inv[arm] = A_inv.tolist()
+            self.b[arm] = (
+                np.array(self.b[arm]) + rewards[arms == arm] @ X_arm
+            ).tolist()
+            self.N[arm] += len(X_arm)
+
+
+class StreamingMetrics:
+    # Per-step statistics averaged over trials, accumulated while simulating
+    # into fixed-size arrays. Steps fold into num_bins bins, so memory stays
+    # constant however many trials and steps are run. Regret is the expected
+    # reward lost against the best arm's mean at the time of each decision.
+    def __init__(self, num_time_steps: int, num_bins: int = None):
+        self.num_time_steps = num_time_steps
+        self.num_bins = min(num_bins or num_time_steps, num_time_steps)
+        self.reward_sum = np.zeros(self.num_bins)
+        self.regret_sum = np.zeros(self.num_bins)  # of the cumulative regret
+        self.optimal_count = np.zeros(self.num_bins, dtype=np.int64)
+        self.count = np.zeros(self.num_bins, dtype=np.int64)
+        self.trials = 0
+        self.total_reward = 0.0
+        self.total_regret = 0.0
+        self.cumulative_regret = 0.0  # of the running trial
+
+    def start_trial(self) -> None:
+        self.trials += 1
+        self.cumulative_regret = 0.0
+
+    def record(
+        self, t: int, arms: list[Arm], arm: int, reward: float, context=None
+    ) -> None:
+        means = [each.mean(context) for each in arms]
+        best = max(means)
+        regret = best - means[arm]
+        self.cumulative_regret += regret
+        self.total_regret += regret
+        self.total_reward += reward
+        i = t * self.num_bins // self.num_time_steps
+        self.reward_sum[i] += reward
+        self.regret_sum[i] += self.cumulative_regret
+        self.optimal_count[i] += means[arm] == best
+        self.count[i] += 1
+
+    def mean_reward(self):
+        return self.reward_sum / np.maximum(self.count, 1)
+
+    def mean_cumulative_regret(self):
+        return self.regret_sum / np.maximum(self.count, 1)
+
+    def optimal_arm_rate(self):
+        return self.optimal_count / np.maximum(self.count, 1)
+
+    def summary(self) -> dict:
+        # per-trial totals, comparable with sums over simulate's rewards
+        trials = max(self.trials, 1)
+        return {
+            "rewards": self.total_reward / trials,
+            "regret": self.total_regret / trials,
+            "optimal_arm_rate": float(
+                self.optimal_count.sum() / max(self.count.sum(), 1)
+            ),
+        }
+
+
+def simulate(
+    policy: Policy,
+    arms: list[Arm],
+    num_trials: int,
+    num_time_steps: int,
+    contexts=None,
+    batch_size: int = 1,
+    metrics: StreamingMetrics = None,
+):
+    # contexts: optional zero-argument callable drawing each step's context,
+    # e.g. uniform_contexts(d); arms move on (Arm.step) after every step
+    # batch_size > 1: select_arms picks batch_size arms at a time and their
+    # rewards come back together through update_many
+    # metrics: rewards go into these streaming metrics, which are returned,
+    # instead of the trials x steps rewards list
+    if batch_size > 1:
+        return simulate_batched(
+            policy, arms, num_trials, num_time_steps, contexts, batch_size, metrics
+        )
     rewards = []
     for _ in range(num_trials):
-        rewards.append([])
-        for _ in range(num_time_steps):
+        if metrics is None:
+            rewards.append([])
+        else:
+            metrics.start_trial()
+        for t in range(num_time_steps):
+            context = None
+            if contexts is not None:
+                context = contexts()
+                policy.observe(context)
             arm = policy.select_arm()
-            reward = arms[arm].pull()
+            reward = arms[arm].pull(context)
             policy.update(arm, reward)
-            rewards[-1].append(reward)
-    return rewards
+            if metrics is None:
+                rewards[-1].append(reward)
+            else:
+                metrics.record(t, arms, arm, reward, context)
+            for each in arms:
+                each.step()
+    return rewards if metrics is None else metrics
+
+
+def simulate_batched(
+    policy: Policy,
+    arms: list[Arm],
+    num_trials: int,
+    num_time_steps: int,
+    contexts,
+    batch_size: int,
+    metrics: StreamingMetrics = None,
+):
+    rewards = []
+    for _ in range(num_trials):
+        if metrics is None:
+            rewards.append([])
+        else:
+            metrics.start_trial()
+        for start in range(0, num_time_steps, batch_size):
+            B = min(batch_size, num_time_steps - start)
+            batch_contexts = None
+            if contexts is not None:
+                batch_contexts = [contexts() for _ in range(B)]
+            selected = policy.select_arms(B, batch_contexts)
+            batch_rewards = []
+            for i, arm in enumerate(selected):
+                context = batch_contexts[i] if batch_contexts is not None else None
+                batch_rewards.append(arms[arm].pull(context))
+                if metrics is not None:
+                    metrics.record(start + i, arms, arm, batch_rewards[-1], context)
+                for each in arms:
+                    each.step()
+            policy.update_many(selected, batch_rewards, batch_contexts)
+            if metrics is None:
+                rewards[-1].extend(batch_rewards)
+    return rewards if metrics is None else metrics
 
 
 def main():
+    import pandas as pd
+
     reward_data = []
     for i in range(1, 10):
         for j in range(1, 10):
@@ -121,15 +580,14 @@ def main():
                 ThompsonSampling(arms),
             ]
             for policy in policies:
-                rewards = simulate(policy, arms, 5, 100)
-                reward_sum = [sum(i) for i in rewards]
+                metrics = simulate(policy, arms, 5, 100, metrics=StreamingMetrics(100))
 
                 reward_data.append(
                     {
                         "policy": policy.__class__.__name__,
                         "left_arm": arms[0].p,
                         "right_arm": arms[1].p,
-                        "rewards": sum(reward_sum) / len(reward_sum),
+                        **metrics.summary(),
                     }
                 )
 
@@ -1,5 +1,13 @@
+import heapq
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 from pydantic import BaseModel
 
+from render import render_all, write_artifact
+from value_cache import ValueCache
+
 
 class Problem(BaseModel):
     name: str
@@ -86,68 +94,356 @@ def diff_value(map: list[list[int]], new_value_map: list[list[float]]):
 
 
 def draw_value_map(name: str, problem: Problem, value_map: list[list[float]]):
-    import plotly.express as px
-
-    fig = px.imshow(value_map)
-    fig.update_layout(
+    # writes the plot data only; python render.py turns it into the image
+    return write_artifact(
+        f"files/3_{name}-{problem.name}.json",
+        "value_map",
+        f"images/3_{name}-{problem.name}.png",
         title=f"{name}-{problem.name}",
-        xaxis_title="x",
-        yaxis_title="y",
-        font=dict(size=18),
+        value_map=value_map,
+        start=problem.start,
+        end=problem.end,
     )
-    for i, j in problem.start:
-        fig.add_annotation(
-            x=j,
-            y=i,
-            text="start",
-            showarrow=False,
-            font=dict(size=18),
-        )
-    for i, j in problem.end:
-        fig.add_annotation(
-            x=j,
-            y=i,
-            text="end",
-            showarrow=False,
-            font=dict(size=18),
-        )
-
-    # save image
-    fig.write_image(f"images/3_{name}-{problem.name}.png")
 
 
-def policy_evaluation(problem: Problem):
-    value_map = [
-        [0 for _ in range(len(problem.map[0]))] for _ in range(len(problem.map))
-    ]
+def solve(
+    problem: Problem,
+    name: str,
+    update,
+    tolerance: float = 0.001,
+    value_map: list[list[float]] = None,
+    cache=None,
+    verbose: bool = True,
+):
+    # cache: optional value_cache.ValueCache; a hit skips the sweeps and a
+    # near miss (same shape, few changed cells) warm-starts them
+    if cache is not None:
+        cached = cache.get(problem, name, tolerance)
+        if cached is not None:
+            if verbose:
+                print("Loaded from cache")
+            return cached
+        if value_map is None:
+            value_map = cache.nearest(problem, name, tolerance)
+    if value_map is None:
+        value_map = [
+            [0.0 for _ in range(len(problem.map[0]))] for _ in range(len(problem.map))
+        ]
     i = 0
     while True:
-        new_value_map = update_value_for_policy(problem, value_map)
-        print_value_map(i, value_map)
-        if diff_value(value_map, new_value_map) < 0.001:
-            print(f"Converge at {i} iteration")
+        new_value_map = update(problem, value_map)
+        if verbose:
+            print_value_map(i, value_map)
+        if diff_value(value_map, new_value_map) < tolerance:
+            if verbose:
+                print(f"Converge at {i} iteration")
             break
         value_map = new_value_map
         i += 1
 
-    draw_value_map("PolicyEvaluation", problem, value_map)
+    if cache is not None:
+        cache.put(problem, name, tolerance, value_map)
+    return value_map
 
 
-def value_iteration(problem: Problem):
+def policy_evaluation(problem: Problem, cache=None, draw: bool = True, **kwargs):
+    value_map = solve(
+        problem, "PolicyEvaluation", update_value_for_policy, cache=cache, **kwargs
+    )
+    if draw:
+        draw_value_map("PolicyEvaluation", problem, value_map)
+    return value_map
+
+
+def shortest_path_values(problem: Problem, step_rewards: list[list[float]] = None):
+    # Exact value_iteration fixed point for deterministic moves: reward_per_step
+    # times the step distance to the nearest end, by multi-source BFS from the
+    # end cells. step_rewards (reward for moving into each cell, all negative)
+    # switches to Dijkstra. With negative rewards, cells that cannot reach an
+    # end get -inf, the value the sweeps diverge towards; with a zero reward
+    # the sweeps leave every cell at 0.
+    if step_rewards is None and problem.reward_per_step > 0:
+        raise ValueError("Shortest paths need a non-positive reward_per_step")
+    if step_rewards is None and problem.reward_per_step == 0:
+        return [[0.0] * len(row) for row in problem.map]
+    if step_rewards is not None and any(
+        reward >= 0 for row in step_rewards for reward in row
+    ):
+        raise ValueError("Shortest paths need negative step_rewards")
+    rows, cols = len(problem.map), len(problem.map[0])
     value_map = [
-        [0.0 for _ in range(len(problem.map[0]))] for _ in range(len(problem.map))
+        [0.0 if problem.map[i][j] == 0 else float("-inf") for j in range(cols)]
+        for i in range(rows)
     ]
-    i = 0
-    while True:
-        new_value_map = update_value(problem, value_map)
-        print_value_map(i, value_map)
-        if diff_value(value_map, new_value_map) < 0.001:
-            print(f"Converge at {i} iteration")
-            break
-        value_map = new_value_map
-        i += 1
+    for i, j in problem.end:
+        value_map[i][j] = 0.0
+
+    def predecessors(i, j):
+        for action in problem.actions:
+            prev_i, prev_j = i - action[0], j - action[1]
+            if (
+                0 <= prev_i < rows
+                and 0 <= prev_j < cols
+                and problem.map[prev_i][prev_j] == 1
+                and (prev_i, prev_j) not in problem.end
+            ):
+                yield prev_i, prev_j
+
+    if step_rewards is None:
+        frontier = deque(problem.end)
+        while frontier:
+            i, j = frontier.popleft()
+            for prev_i, prev_j in predecessors(i, j):
+                if value_map[prev_i][prev_j] == float("-inf"):
+                    value_map[prev_i][prev_j] = (
+                        value_map[i][j] + problem.reward_per_step
+                    )
+                    frontier.append((prev_i, prev_j))
+        return value_map
+
+    # max-heap on value, as a min-heap on cost
+    heap = [(0.0, i, j) for i, j in problem.end]
+    done = set()
+    while heap:
+        cost, i, j = heapq.heappop(heap)
+        if (i, j) in done:
+            continue
+        done.add((i, j))
+        for prev_i, prev_j in predecessors(i, j):
+            value = value_map[i][j] + step_rewards[i][j]
+            if value > value_map[prev_i][prev_j]:
+                value_map[prev_i][prev_j] = value
+                heapq.heappush(heap, (-value, prev_i, prev_j))
+    return value_map
+
+
+def value_iteration(
+    problem: Problem, cache=None, draw: bool = True, exact: bool = False, **kwargs
+):
+    # exact: skip the sweeps and read the fixed point off shortest paths
+    if exact:
+        value_map = shortest_path_values(problem)
+    else:
+        value_map = solve(
+            problem, "ValueIteration", update_value, cache=cache, **kwargs
+        )
+    if draw:
+        draw_value_map("ValueIteration", problem, value_map)
+    return value_map
+
 
-    draw_value_map("ValueIteration", problem, value_map)
+def reachable_cells(problem: Problem):
+    # passable cells from which some end cell can be reached
+    rows, cols = len(problem.map), len(problem.map[0])
+    reached = set(problem.end)
+    frontier = list(problem.end)
+    while frontier:
+        i, j = frontier.pop()
+        for action in problem.actions:
+            prev_i, prev_j = i - action[0], j - action[1]
+            if (
+                0 <= prev_i < rows
+                and 0 <= prev_j < cols
+                and problem.map[prev_i][prev_j] == 1
+                and (prev_i, prev_j) not in reached
+            ):
+                reached.add((prev_i, prev_j))
+                frontier.append((prev_i, prev_j))
+    return reached
+
+
+def coarsen(problem: Problem):
+    # 2x2 blocks become one coarse cell, passable only if all four cells are.
+    # Blocks are represented by the cell at the end's offset within them (see
+    # prolong), which needs a single end; other mazes get plain sweeps.
+    if len(problem.end) != 1:
+        return None
+    rows, cols = len(problem.map) // 2, len(problem.map[0]) // 2
+    coarse = Problem(
+        name=f"{problem.name}-coarse",
+        map=[
+            [
+                int(
+                    all(
+                        problem.map[2 * i + di][2 * j + dj] == 1
+                        for di in range(2)
+                        for dj in range(2)
+                    )
+                )
+                for j in range(cols)
+            ]
+            for i in range(rows)
+        ],
+        actions=problem.actions,
+        start=[],
+        end=[(problem.end[0][0] // 2, problem.end[0][1] // 2)],
+        reward_per_step=2 * problem.reward_per_step,
+    )
+    end_i, end_j = coarse.end[0]
+    if end_i >= rows or end_j >= cols or coarse.map[end_i][end_j] == 0:
+        return None
+    # cells cut off by the stricter coarse walls would never converge
+    reached = reachable_cells(coarse)
+    for i in range(rows):
+        for j in range(cols):
+            if (i, j) not in reached:
+                coarse.map[i][j] = 0
+    return coarse
+
+
+def prolong(problem: Problem, coarse: Problem, coarse_value_map: list[list[float]]):
+    # Initial fine values from the coarse solution: the value of walking to the
+    # block's representative cell and following the coarse path from there.
+    # Every block is represented by the cell at the end's offset within it, so
+    # a coarse step moves between representatives along passable cells and
+    # coarse values are values of real fine paths. Cells outside the coarse
+    # maze get a pessimistic value, so the result is a lower bound that is
+    # exact wherever the coarse path is optimal.
+    offset_i, offset_j = problem.end[0][0] % 2, problem.end[0][1] % 2
+    passable = sum(map(sum, problem.map))
+    value_map = []
+    for i in range(len(problem.map)):
+        value_map.append([])
+        for j in range(len(problem.map[0])):
+            bi, di = divmod(i, 2)
+            bj, dj = divmod(j, 2)
+            if problem.map[i][j] == 0 or (i, j) in problem.end:
+                value = 0.0
+            elif (
+                bi < len(coarse.map)
+                and bj < len(coarse.map[0])
+                and coarse.map[bi][bj] == 1
+            ):
+                steps = abs(di - offset_i) + abs(dj - offset_j)
+                value = coarse_value_map[bi][bj] + problem.reward_per_step * steps
+            else:
+                value = float(problem.reward_per_step * passable)
+            value_map[-1].append(value)
+    return value_map
+
+
+def multigrid_value_iteration(
+    problem: Problem,
+    min_size: int = 8,
+    tolerance: float = 0.001,
+    verbose: bool = True,
+    draw: bool = True,
+):
+    # Coarse-to-fine value iteration: solve a downsampled maze first and use
+    # its values as the initial value_map of the next finer level.
+    def solve_level(level: Problem, verbose: bool = False):
+        coarse = None
+        if min(len(level.map), len(level.map[0])) > min_size:
+            coarse = coarsen(level)
+        if coarse is None:
+            return solve(
+                level, "ValueIteration", update_value, tolerance, verbose=verbose
+            )
+        return solve(
+            level,
+            "ValueIteration",
+            update_value,
+            tolerance,
+            value_map=prolong(level, coarse, solve_level(coarse)),
+            verbose=verbose,
+        )
+
+    value_map = solve_level(problem, verbose)
+    if draw:
+        draw_value_map("MultigridValueIteration", problem, value_map)
+    return value_map
+
+
+def solve_group(problems: list[Problem], name: str, tolerance: float = 0.001):
+    # Sweeps for same-shape Problems sharing actions, stacked as (problem, cell)
+    # arrays and updated in lockstep. An instance stops updating once it
+    # converges, at the same iteration solve would stop at.
+    rows, cols = len(problems[0].map), len(problems[0].map[0])
+    passable = np.array([problem.map for problem in problems]).reshape(
+        len(problems), -1
+    )
+    passable = passable == 1
+    fixed = ~passable
+    for k, problem in enumerate(problems):
+        for i, j in problem.end:
+            fixed[k, i * cols + j] = True
+    rewards = np.array([[problem.reward_per_step] for problem in problems], float)
+
+    # per action: the cell each move lands on (itself when it leaves the grid)
+    # and whether it is allowed (moves into walls are not)
+    i, j = np.indices((rows, cols))
+    targets, allowed = [], []
+    for action in problems[0].actions:
+        next_i, next_j = i + action[0], j + action[1]
+        in_grid = (0 <= next_i) & (next_i < rows) & (0 <= next_j) & (next_j < cols)
+        target = np.where(in_grid, next_i * cols + next_j, i * cols + j).reshape(-1)
+        targets.append(target)
+        allowed.append(~in_grid.reshape(-1) | passable[:, target])
+    targets, allowed = np.array(targets), np.array(allowed)
+    counts = allowed.sum(axis=0)
+
+    value_map = np.zeros(passable.shape)
+    active = np.ones(len(problems), dtype=bool)
+    while active.any():
+        values = value_map[active]
+        candidates = values[:, targets].transpose(1, 0, 2) + rewards[active]
+        if name == "ValueIteration":
+            new_values = np.where(allowed[:, active], candidates, -np.inf).max(axis=0)
+        else:
+            new_values = np.where(allowed[:, active], candidates, 0.0).sum(axis=0)
+            new_values /= np.maximum(counts[active], 1)
+        new_values[fixed[active]] = 0.0
+        converged = np.abs(values - new_values).sum(axis=1) < tolerance
+        indices = np.flatnonzero(active)
+        value_map[indices[~converged]] = new_values[~converged]
+        active[indices[converged]] = False
+    return value_map.reshape(len(problems), rows, cols).tolist()
+
+
+def solve_batch(
+    problems: list[Problem],
+    name: str = "ValueIteration",
+    tolerance: float = 0.001,
+    cache=None,
+    max_workers: int = None,
+):
+    # Value maps of many Problems in one call; name is "ValueIteration" or
+    # "PolicyEvaluation". Problems are grouped by shape and actions, and the
+    # groups run in a process pool when there is more than one.
+    value_maps = [None] * len(problems)
+    groups = {}
+    for k, problem in enumerate(problems):
+        if cache is not None:
+            value_maps[k] = cache.get(problem, name, tolerance)
+            if value_maps[k] is not None:
+                continue
+        key = (
+            len(problem.map),
+            len(problem.map[0]),
+            tuple(map(tuple, problem.actions)),
+        )
+        groups.setdefault(key, []).append(k)
+
+    batches = [[problems[k] for k in indices] for indices in groups.values()]
+    if len(batches) > 1:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(
+                executor.map(
+                    solve_group,
+                    batches,
+                    [name] * len(batches),
+                    [tolerance] * len(batches),
+                )
+            )
+    else:
+        results = [solve_group(batch, name, tolerance) for batch in batches]
+
+    for indices, result in zip(groups.values(), results):
+        for k, value_map in zip(indices, result):
+            value_maps[k] = value_map
+            if cache is not None:
+                cache.put(problems[k], name, tolerance, value_map)
+    return value_maps
 
 
 if __name__ == "__main__":
@@ -182,7 +478,13 @@ if __name__ == "__main__":
         end=[(6, 7)],
         reward_per_step=-1,
     )
-    policy_evaluation(easy)
-    value_iteration(easy)
-    policy_evaluation(hard)
-    value_iteration(hard)
+    cache = ValueCache()
+    policy_evaluation(easy, cache)
+    value_iteration(easy, cache)
+    policy_evaluation(hard, cache)
+    value_iteration(hard, cache)
+    render_all(
+        f"files/3_{name}-{problem.name}.json"
+        for name in ("PolicyEvaluation", "ValueIteration")
+        for problem in (easy, hard)
+    )
@@ -7,9 +7,10 @@
 import copy
 import random
 
-import matplotlib.pyplot as plt
 import numpy as np
 
+from render import render, write_artifact
+
 # 0: left, 1: down, 2: right, 3: up
 actions = [0, 1, 2, 3]
 
@@ -128,6 +129,237 @@ def dyna_q_learning(n, alpha, epsilon, gamma, planning_step):
     return steps
 
 
+class Maze:
+    # Grid world whose walls can change mid-run. Transitions are precomputed
+    # per (y, x, action) and only the cells around a change are recomputed.
+    def __init__(self, grid, start=(6, 4)):
+        self.grid = np.array(grid)
+        self.start = start
+        rows, cols = self.grid.shape
+        self.next_y = np.zeros((rows, cols, len(actions)), dtype=np.int64)
+        self.next_x = np.zeros((rows, cols, len(actions)), dtype=np.int64)
+        self.available = np.zeros((rows, cols, len(actions)), dtype=bool)
+        for y in range(rows):
+            for x in range(cols):
+                self._update_cell(y, x)
+
+    def _update_cell(self, y, x):
+        rows, cols = self.grid.shape
+        for action, (dy, dx) in enumerate([(0, -1), (1, 0), (0, 1), (-1, 0)]):
+            ny, nx = y + dy, x + dx
+            if ny < 0 or ny >= rows or nx < 0 or nx >= cols or self.grid[ny, nx] == -1:
+                ny, nx = y, x
+            self.next_y[y, x, action] = ny
+            self.next_x[y, x, action] = nx
+            self.available[y, x, action] = (ny, nx) != (y, x)
+
+    def set_cell(self, y, x, value):
+        # value: -1 wall, 0 floor, > 0 goal reward
+        # returns the (y, x, action) keys whose next state or reward changed
+        rows, cols = self.grid.shape
+        cells = [(y, x), (y, x - 1), (y + 1, x), (y, x + 1), (y - 1, x)]
+        cells = [(i, j) for i, j in cells if 0 <= i < rows and 0 <= j < cols]
+        before = {
+            cell: (self.next_y[cell].copy(), self.next_x[cell].copy()) for cell in cells
+        }
+        old_value = self.grid[y, x]
+        self.grid[y, x] = value
+        changed = []
+        for i, j in cells:
+            self._update_cell(i, j)
+            old_y, old_x = before[(i, j)]
+            for action in actions:
+                ny, nx = self.next_y[i, j, action], self.next_x[i, j, action]
+                if (
+                    ny != old_y[action]
+                    or nx != old_x[action]
+                    or ((ny, nx) == (y, x) and value != old_value)
+                ):
+                    changed.append((i, j, action))
+        return changed
+
+    def step(self, y, x, action):
+        ny, nx = self.next_y[y, x, action], self.next_x[y, x, action]
+        return ny, nx, self.grid[ny, nx]
+
+
+def batched_dyna_q_learning(
+    alphas, epsilons, gammas, planning_steps, num_episodes=100, seed=None, maze=None
+):
+    # Trains M independent agents at once on a stacked (M, rows, cols, 4) q_table.
+    # alphas, epsilons, gammas, planning_steps: scalars or arrays of length M
+    # returns steps: (M, num_episodes), same meaning as dyna_q_learning
+    rng = np.random.default_rng(seed)
+    alphas, epsilons, gammas, planning_steps = np.broadcast_arrays(
+        *[np.atleast_1d(v) for v in (alphas, epsilons, gammas, planning_steps)]
+    )
+    alphas = alphas.astype(np.float64)
+    epsilons = epsilons.astype(np.float64)
+    gammas = gammas.astype(np.float64)
+    planning_steps = planning_steps.astype(np.int64)
+    num_agents = len(alphas)
+    agents = np.arange(num_agents)
+
+    if maze is None:
+        maze = Maze(map)
+    next_y, next_x, available = maze.next_y, maze.next_x, maze.available
+    grid = maze.grid
+    rows, cols = grid.shape
+    num_keys = rows * cols * len(actions)
+    start = maze.start
+
+    q_table = np.zeros((num_agents, rows, cols, len(actions)))
+    # model[(y, x, action)] = (reward, next_y, next_x), stored per agent as arrays;
+    # seen_keys lists the flat (y, x, action) indices in the model in insertion order
+    model_reward = np.zeros((num_agents, num_keys))
+    model_next_y = np.zeros((num_agents, num_keys), dtype=np.int64)
+    model_next_x = np.zeros((num_agents, num_keys), dtype=np.int64)
+    in_model = np.zeros((num_agents, num_keys), dtype=bool)
+    seen_keys = np.zeros((num_agents, num_keys), dtype=np.int64)
+    num_seen = np.zeros(num_agents, dtype=np.int64)
+
+    steps = np.zeros((num_agents, num_episodes), dtype=np.int64)
+    episode = np.zeros(num_agents, dtype=np.int64)
+    step = np.zeros(num_agents, dtype=np.int64)
+    y = np.full(num_agents, start[0])
+    x = np.full(num_agents, start[1])
+
+    while True:
+        active = agents[episode < num_episodes]
+        if len(active) == 0:
+            break
+        ay, ax = y[active], x[active]
+
+        # epsilon-greedy over available actions, greedy ties broken at random
+        noise = rng.random((len(active), len(actions)))
+        explore_action = np.argmax(available[ay, ax] * noise, axis=1)
+        q = q_table[active, ay, ax]
+        greedy_action = np.argmax((q == q.max(axis=1, keepdims=True)) * noise, axis=1)
+        explore = rng.random(len(active)) < epsilons[active]
+        action = np.where(explore, explore_action, greedy_action)
+
+        ny, nx = next_y[ay, ax, action], next_x[ay, ax, action]
+        reward = grid[ny, nx]
+        q_table[active, ay, ax, action] += alphas[active] * (
+            reward
+            + gammas[active] * q_table[active, ny, nx].max(axis=1)
+            - q_table[active, ay, ax, action]
+        )
+
+        key = (ay * cols + ax) * len(actions) + action
+        new = ~in_model[active, key]
+        new_agents = active[new]
+        seen_keys[new_agents, num_seen[new_agents]] = key[new]
+        num_seen[new_agents] += 1
+        in_model[active, key] = True
+        model_reward[active, key] = reward
+        model_next_y[active, key] = ny
+        model_next_x[active, key] = nx
+
+        done = reward > 0
+        finished = active[done]
+        steps[finished, episode[finished]] = step[finished]
+        episode[finished] += 1
+        step[finished] = 0
+        y[finished], x[finished] = start
+
+        running = active[~done]
+        y[running], x[running] = ny[~done], nx[~done]
+        step[running] += 1
+
+        for k in range(planning_steps[running].max(initial=0)):
+            planner = running[planning_steps[running] > k]
+            sample = (rng.random(len(planner)) * num_seen[planner]).astype(np.int64)
+            key = seen_keys[planner, sample]
+            sa, sy_x = key % len(actions), key // len(actions)
+            sy, sx = sy_x // cols, sy_x % cols
+            py, px = model_next_y[planner, key], model_next_x[planner, key]
+            q_table[planner, sy, sx, sa] += alphas[planner] * (
+                model_reward[planner, key]
+                + gammas[planner] * q_table[planner, py, px].max(axis=1)
+                - q_table[planner, sy, sx, sa]
+            )
+    return steps
+
+
+def dyna_q_plus(
+    maze, alpha, epsilon, gamma, planning_step, kappa, num_steps, changes=None
+):
+    # Dyna-Q+ on a maze that may change during learning.
+    # changes: {time step: [(y, x, value), ...]} applied through Maze.set_cell;
+    # only the model entries whose transition changed are dropped, the q_table is kept.
+    # kappa = 0 gives plain Dyna-Q. Returns the cumulative reward at every step.
+    changes = changes or {}
+    q_table = np.zeros(maze.grid.shape + (len(actions),))
+    model = {}
+    model_keys = []
+    model_index = {}
+    last_visit = {}
+    visited = set()
+
+    def add_to_model(key, value):
+        if key not in model:
+            model_index[key] = len(model_keys)
+            model_keys.append(key)
+        model[key] = value
+
+    def remove_from_model(key):
+        if key not in model:
+            return
+        del model[key]
+        index = model_index.pop(key)
+        last_key = model_keys.pop()
+        if last_key != key:
+            model_keys[index] = last_key
+            model_index[last_key] = index
+
+    cumulative_rewards = []
+    total_reward = 0
+    y, x = maze.start
+    for t in range(num_steps):
+        for cell_y, cell_x, value in changes.get(t, []):
+            for key in maze.set_cell(cell_y, cell_x, value):
+                remove_from_model(key)
+                # keep a Dyna-Q+ placeholder so the changed action gets explored again
+                if kappa > 0 and key[:2] in visited:
+                    add_to_model(key, (0, key[0], key[1]))
+
+        if kappa > 0 and (y, x) not in visited:
+            # untried actions are modelled as leading back to the same state
+            for action in actions:
+                if maze.available[y, x, action]:
+                    add_to_model((y, x, action), (0, y, x))
+                    last_visit.setdefault((y, x, action), 0)
+        visited.add((y, x))
+
+        if random.random() < epsilon:
+            action = random.choice(np.flatnonzero(maze.available[y, x]))
+        else:
+            action = np.random.choice(np.where(q_table[y, x] == q_table[y, x].max())[0])
+        next_y, next_x, reward = maze.step(y, x, action)
+        q_table[y, x, action] += alpha * (
+            reward + gamma * np.max(q_table[next_y, next_x]) - q_table[y, x, action]
+        )
+        add_to_model((y, x, action), (reward, next_y, next_x))
+        last_visit[(y, x, action)] = t
+
+        total_reward += reward
+        cumulative_rewards.append(total_reward)
+        if reward > 0:
+            y, x = maze.start
+        else:
+            y, x = next_y, next_x
+
+        for _ in range(planning_step):
+            key = random.choice(model_keys)
+            model_reward, model_y, model_x = model[key]
+            model_reward += kappa * np.sqrt(t - last_visit.get(key, 0))
+            q_table[key] += alpha * (
+                model_reward + gamma * np.max(q_table[model_y, model_x]) - q_table[key]
+            )
+    return cumulative_rewards
+
+
 def main():
     n = 10
     alpha = 0.1
@@ -135,17 +367,21 @@ def main():
     gamma = 0.95
     planning_steps = [0, 5, 50]
 
+    curves = {}
     for planning_step in planning_steps:
         steps = dyna_q_learning(n, alpha, epsilon, gamma, planning_step)
         print("planning step: {}".format(planning_step))
-        plt.plot(steps, label="planning step: {}".format(planning_step))
-    plt.legend()
-    plt.title("Dyna-Q Learning")
-    plt.xlabel("Episode")
-    plt.ylabel("Steps")
-    plt.show()
-    # save image
-    plt.savefig("images/6_DynaQ.png")
+        curves["planning step: {}".format(planning_step)] = [int(s) for s in steps]
+    artifact = write_artifact(
+        "files/6_DynaQ.json",
+        "curves",
+        "images/6_DynaQ.png",
+        title="Dyna-Q Learning",
+        xlabel="Episode",
+        ylabel="Steps",
+        curves=curves,
+    )
+    render(artifact)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+import glob
+import json
+import sys
+
+# Solvers and trainers only write small JSON artifacts; rendering them to
+# images is a separate step that imports the plotting libraries on demand.
+
+
+def write_artifact(file_name: str, kind: str, image: str, **data):
+    with open(file_name, "w") as f:
+        json.dump({"kind": kind, "image": image, **data}, f)
+    return file_name
+
+
+def write_win_rate(prefix: str, name: str, win_rate: list[float]):
+    # per-round win rates of one player, as returned by blackjack.train
+    return write_artifact(
+        f"files/{prefix}_{name}_win_rate.json",
+        "line",
+        f"images/{prefix}_{name}.png",
+        title=f"Win rate ({name})",
+        xaxis_title="Episode",
+        yaxis_title="Win rate",
+        tickformat=".2%",
+        y=win_rate,
+    )
+
+
+def render_value_map(artifact):
+    import plotly.express as px
+
+    fig = px.imshow(artifact["value_map"])
+    fig.update_layout(
+        title=artifact["title"],
+        xaxis_title="x",
+        yaxis_title="y",
+        font=dict(size=18),
+    )
+    for text in ("start", "end"):
+        for i, j in artifact[text]:
+            fig.add_annotation(
+                x=j,
+                y=i,
+                text=text,
+                showarrow=False,
+                font=dict(size=18),
+            )
+    fig.write_image(artifact["image"])
+
+
+def render_line(artifact):
+    import plotly.express as px
+
+    fig = px.line(y=artifact["y"])
+    if artifact.get("tickformat"):
+        fig.update_yaxes(tickformat=artifact["tickformat"])
+    fig.update_layout(
+        title=artifact["title"],
+        xaxis_title=artifact["xaxis_title"],
+        yaxis_title=artifact["yaxis_title"],
+    )
+    fig.write_image(artifact["image"])
+
+
+def render_curves(artifact):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.figure()
+    for label, curve in artifact["curves"].items():
+        plt.plot(curve, label=label)
+    plt.legend()
+    plt.title(artifact["title"])
+    plt.xlabel(artifact["xlabel"])
+    plt.ylabel(artifact["ylabel"])
+    plt.savefig(artifact["image"])
+    plt.close()
+
+
+RENDERERS = {
+    "value_map": render_value_map,
+    "line": render_line,
+    "curves": render_curves,
+}
+
+
+def render(file_name: str):
+    with open(file_name) as f:
+        artifact = json.load(f)
+    RENDERERS[artifact["kind"]](artifact)
+    return artifact["image"]
+
+
+def render_all(file_names):
+    for file_name in file_names:
+        print(f"{file_name} -> {render(file_name)}")
+
+
+def is_artifact(file_name: str):
+    try:
+        with open(file_name) as f:
+            return json.load(f).get("kind") in RENDERERS
+    except (ValueError, AttributeError):
+        return False
+
+
+if __name__ == "__main__":
+    # python render.py [artifact.json ...]; defaults to every artifact in files/
+    file_names = sys.argv[1:] or [
+        file_name
+        for file_name in sorted(glob.glob("files/*.json"))
+        if is_artifact(file_name)
+    ]
+    render_all(file_names)
@@ -0,0 +1,131 @@
+import numpy as np
+import torch
+
+
+class TensorReplayMemory:
+    # Replay memory in preallocated contiguous tensors. Insertion writes one
+    # row of a ring buffer and sampling is a single index gather per field.
+    def __init__(self, capacity, n_observations, device="cpu"):
+        self.capacity = capacity
+        self.device = device
+        self.states = torch.zeros((capacity, n_observations), device=device)
+        self.actions = torch.zeros((capacity, 1), dtype=torch.long, device=device)
+        self.rewards = torch.zeros(capacity, device=device)
+        self.next_states = torch.zeros((capacity, n_observations), device=device)
+        self.dones = torch.zeros(capacity, dtype=torch.bool, device=device)
+        self.position = 0
+        self.size = 0
+
+    def push(self, state, action, next_state, reward):
+        """Save a transition; next_state is None when the episode terminated"""
+        i = self.position
+        self.states[i] = state.reshape(-1)
+        self.actions[i] = action.reshape(-1)
+        self.rewards[i] = reward.reshape(-1)[0]
+        if next_state is None:
+            self.dones[i] = True
+            self.next_states[i] = 0
+        else:
+            self.dones[i] = False
+            self.next_states[i] = next_state.reshape(-1)
+        self.written(torch.tensor([i]))
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def push_many(self, states, actions, rewards, next_states, dones):
+        """Save a batch of transitions; next_states rows of done transitions are ignored"""
+        n = len(states)
+        indices = (torch.arange(n) + self.position) % self.capacity
+        device_indices = indices.to(self.device)
+        self.states[device_indices] = states
+        self.actions[device_indices] = actions.reshape(-1, 1)
+        self.rewards[device_indices] = rewards
+        self.next_states[device_indices] = next_states
+        self.dones[device_indices] = dones
+        self.written(indices)
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def written(self, indices):
+        pass
+
+    def gather(self, indices):
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            self.next_states[indices],
+            self.dones[indices],
+        )
+
+    def sample(self, batch_size):
+        """Returns (indices, states, actions, rewards, next_states, dones)"""
+        indices = torch.randint(0, self.size, (batch_size,), device=self.device)
+        return (indices,) + self.gather(indices)
+
+    def __len__(self):
+        return self.size
+
+
+class SumTree:
+    # Binary tree over the priorities; every parent stores the sum of its children
+    def __init__(self, capacity):
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.tree = np.zeros(2 * self.leaves)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices) + self.leaves
+        self.tree[nodes] = priorities
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        # leaf index whose cumulative priority range contains each value
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self.leaves:
+            left = 2 * nodes
+            go_right = values > self.tree[left]
+            values -= np.where(go_right, self.tree[left], 0.0)
+            nodes = left + go_right
+        return nodes - self.leaves
+
+
+class PrioritizedReplayMemory(TensorReplayMemory):
+    # Proportional prioritized replay: P(i) ~ priority_i ** alpha, with
+    # importance-sampling weights annealed by beta.
+    def __init__(
+        self, capacity, n_observations, device="cpu", alpha=0.6, beta=0.4, eps=1e-5
+    ):
+        super().__init__(capacity, n_observations, device)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def written(self, indices):
+        self.tree.update(indices.numpy(), self.max_priority)
+
+    def sample(self, batch_size):
+        """Returns (indices, states, actions, rewards, next_states, dones, weights)"""
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + np.random.random(batch_size)) * segment
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+        probabilities = self.tree.tree[indices + self.tree.leaves] / self.tree.total
+        weights = (self.size * probabilities) ** -self.beta
+        weights = torch.as_tensor(weights / weights.max(), dtype=torch.float32)
+        indices = torch.as_tensor(indices, device=self.device)
+        return (indices,) + self.gather(indices) + (weights.to(self.device),)
+
+    def update_priorities(self, indices, td_errors):
+        priorities = (td_errors.detach().abs().cpu().numpy() + self.eps) ** self.alpha
+        self.tree.update(indices.cpu().numpy(), priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+
+
+class ValueCache:
+    # Converged value maps on disk, keyed by a hash of what determines them:
+    # map, actions, end, reward_per_step, algorithm and tolerance. The least
+    # recently used entries are evicted beyond max_entries.
+    def __init__(self, directory: str = "files/value_cache", max_entries: int = 64):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self.index_file = os.path.join(directory, "index.json")
+        if os.path.exists(self.index_file):
+            with open(self.index_file) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+        self.clock = max([entry["last_used"] for entry in self.index.values()] + [0])
+
+    @staticmethod
+    def describe(problem, algorithm: str, tolerance: float):
+        # json round trip so tuples and lists compare equal
+        return json.loads(
+            json.dumps(
+                {
+                    "map": problem.map,
+                    "actions": problem.actions,
+                    "end": sorted(problem.end),
+                    "reward_per_step": problem.reward_per_step,
+                    "algorithm": algorithm,
+                    "tolerance": tolerance,
+                }
+            )
+        )
+
+    def key(self, problem, algorithm: str, tolerance: float):
+        description = self.describe(problem, algorithm, tolerance)
+        return hashlib.sha256(
+            json.dumps(description, sort_keys=True).encode()
+        ).hexdigest()
+
+    def value_file(self, key: str):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def touch(self, key: str):
+        self.clock += 1
+        self.index[key]["last_used"] = self.clock
+
+    def save_index(self):
+        with open(self.index_file, "w") as f:
+            json.dump(self.index, f)
+
+    def get(self, problem, algorithm: str, tolerance: float):
+        key = self.key(problem, algorithm, tolerance)
+        if key not in self.index or not os.path.exists(self.value_file(key)):
+            return None
+        self.touch(key)
+        self.save_index()
+        with open(self.value_file(key)) as f:
+            return json.load(f)
+
+    def put(self, problem, algorithm: str, tolerance: float, value_map):
+        key = self.key(problem, algorithm, tolerance)
+        with open(self.value_file(key), "w") as f:
+            json.dump(value_map, f)
+        self.index[key] = self.describe(problem, algorithm, tolerance)
+        self.touch(key)
+        while len(self.index) > self.max_entries:
+            oldest = min(self.index, key=lambda k: self.index[k]["last_used"])
+            del self.index[oldest]
+            if os.path.exists(self.value_file(oldest)):
+                os.remove(self.value_file(oldest))
+        self.save_index()
+
+    def nearest(self, problem, algorithm: str, tolerance: float):
+        # cached value map of the same-shape problem whose map differs in the
+        # fewest cells, with everything else equal; None if there is none
+        description = self.describe(problem, algorithm, tolerance)
+        best_key, best_distance = None, None
+        for key, entry in self.index.items():
+            if any(
+                entry[name] != description[name]
+                for name in ("actions", "end", "reward_per_step", "algorithm")
+            ):
+                continue
+            if len(entry["map"]) != len(problem.map) or any(
+                len(row) != len(other) for row, other in zip(entry["map"], problem.map)
+            ):
+                continue
+            distance = sum(
+                a != b
+                for row, other in zip(entry["map"], problem.map)
+                for a, b in zip(row, other)
+            )
+            if best_distance is None or distance < best_distance:
+                best_key, best_distance = key, distance
+        if best_key is None or not os.path.exists(self.value_file(best_key)):
+            return None
+        with open(self.value_file(best_key)) as f:
+            return json.load(f)
@@ -0,0 +1,102 @@
+import gymnasium as gym
+import numpy as np
+import torch
+
+
+class VectorCollector:
+    # Steps num_envs copies of an environment together. Actions for all of them
+    # come from one batched policy_net forward pass and the resulting
+    # transitions go into replay memory with a single push_many.
+    def __init__(
+        self,
+        num_envs,
+        policy_net,
+        memory,
+        device="cpu",
+        env_id="CartPole-v1",
+        asynchronous=False,
+        seed=None,
+        autoreset_mode=None,
+    ):
+        # autoreset_mode: gymnasium >= 1.0 only, e.g. gym.vector.AutoresetMode.SAME_STEP
+        env_fns = [lambda: gym.make(env_id) for _ in range(num_envs)]
+        kwargs = {} if autoreset_mode is None else {"autoreset_mode": autoreset_mode}
+        if asynchronous:
+            self.envs = gym.vector.AsyncVectorEnv(env_fns, **kwargs)
+        else:
+            self.envs = gym.vector.SyncVectorEnv(env_fns, **kwargs)
+        # gymnasium < 1.0 has no autoreset_mode and always resets on the same step
+        mode = self.envs.metadata.get("autoreset_mode")
+        mode = getattr(mode, "value", mode)
+        if mode not in (None, "SameStep", "NextStep"):
+            raise ValueError(f"Unsupported autoreset mode {mode}")
+        self.same_step = mode in (None, "SameStep")
+        self.num_envs = num_envs
+        self.policy_net = policy_net
+        self.memory = memory
+        self.device = device
+        self.n_actions = self.envs.single_action_space.n
+        observations, _ = self.envs.reset(seed=seed)
+        self.states = self.as_tensor(observations)
+        # with next-step autoreset (gymnasium >= 1.0) the step after an episode
+        # ends only resets that env, so its transition is skipped
+        self.resetting = np.zeros(num_envs, dtype=bool)
+        self.episode_lengths = np.zeros(num_envs, dtype=np.int64)
+        self.episode_durations = []
+
+    def as_tensor(self, observations):
+        return torch.as_tensor(observations, dtype=torch.float32, device=self.device)
+
+    def select_actions(self, eps_threshold):
+        with torch.no_grad():
+            actions = self.policy_net(self.states).max(1).indices
+        explore = torch.rand(self.num_envs, device=self.device) < eps_threshold
+        random_actions = torch.randint(
+            0, self.n_actions, (self.num_envs,), device=self.device
+        )
+        return torch.where(explore, random_actions, actions)
+
+    def step(self, eps_threshold):
+        """Steps every env once; returns the number of transitions stored"""
+        actions = self.select_actions(eps_threshold)
+        observations, rewards, terminated, truncated, infos = self.envs.step(
+            actions.cpu().numpy()
+        )
+        # next_states are what gets stored; self.states always continues
+        # from observations, which are already reset for finished envs
+        next_states = self.as_tensor(observations)
+        done = terminated | truncated
+
+        if self.same_step:
+            # the real last observation of a finished env is in infos, as
+            # "final_obs" (gymnasium >= 1.0) or "final_observation" (< 1.0)
+            final = infos.get("final_obs", infos.get("final_observation"))
+            valid = np.ones(self.num_envs, dtype=bool)
+            next_states = next_states.clone()
+            for i in np.flatnonzero(done):
+                next_states[i] = self.as_tensor(final[i])
+        else:
+            valid = ~self.resetting
+            self.resetting = done
+
+        valid_indices = torch.as_tensor(np.flatnonzero(valid), device=self.device)
+        if len(valid_indices):
+            self.memory.push_many(
+                self.states[valid_indices],
+                actions[valid_indices],
+                torch.as_tensor(rewards, dtype=torch.float32, device=self.device)[
+                    valid_indices
+                ],
+                next_states[valid_indices],
+                torch.as_tensor(terminated, device=self.device)[valid_indices],
+            )
+
+        self.episode_lengths += valid
+        finished = done & valid
+        self.episode_durations.extend(self.episode_lengths[finished].tolist())
+        self.episode_lengths[finished] = 0
+        self.states = self.as_tensor(observations)
+        return len(valid_indices)
+
+    def close(self):
+        self.envs.close()